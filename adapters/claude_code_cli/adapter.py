@@ -5,19 +5,34 @@ Integrates Claude Code CLI with Ziwei platform through Taibai.
 """
 
 import asyncio
+import codecs
 import json
+import logging
+import os
 import subprocess
 import sys
-from typing import Optional
-from pathlib import Path
+from typing import Any, Callable, Optional, Union
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "sdk" / "python"))
+import orjson
 
 from ziwei_taibai.adapters.cli_base import CLIAdapterBase
 from ziwei_taibai.adapters.base import Task, TaskResult, HealthStatus, AdapterConfig
+from ziwei_taibai.adapters.batcher import ActionBatcher
 from ziwei_taibai.agent import Agent
 
+if sys.version_info >= (3, 11):
+    from asyncio import timeout as _timeout
+else:
+    from async_timeout import timeout as _timeout
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from CLI stdout per iteration when streaming output
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Queued by _stop_pool to wake callers still waiting for a pooled worker
+_POOL_STOPPED = object()
+
 
 class ClaudeCodeCLIAdapter(CLIAdapterBase):
     """
@@ -34,6 +49,17 @@ class ClaudeCodeCLIAdapter(CLIAdapterBase):
 
         super().__init__(config, cli_path, cli_args)
 
+        # Optional pool of long-lived CLI workers (0 = spawn per task)
+        self.pool_size = int(config.get("CLI_POOL_SIZE", 0))
+        self.response_sentinel = config.get("CLI_POOL_SENTINEL", "<END>").encode() + b"\n"
+        self._workers: Optional[asyncio.Queue] = None
+        self._action_batcher: Optional[ActionBatcher] = None
+
+        # Cap concurrent tasks so a burst can't fork unbounded CLI processes
+        self.max_concurrent_tasks = int(config.get("MAX_CONCURRENT_TASKS", os.cpu_count() or 1))
+        self._task_slots = asyncio.Semaphore(self.max_concurrent_tasks)
+        self._active_tasks = 0
+
         # Initialize Taibai SDK
         self.sdk = Agent(
             owner=config.owner_id,
@@ -44,23 +70,32 @@ class ClaudeCodeCLIAdapter(CLIAdapterBase):
     async def initialize(self) -> bool:
         """
         Initialize adapter:
-        1. Discover Tianshu
-        2. Register agent
-        3. Start heartbeat loop
+        1. Discover Tianshu and register agent (concurrently)
+        2. Start heartbeat loop
         """
         try:
-            # Discover Tianshu
-            discovery = self.sdk.discover()
-            print(f"[ClaudeCodeCLI] Discovered Tianshu: {discovery}")
-
-            # Register agent
-            result = self.sdk.register(agent_display_id="claude-code-cli")
-            print(f"[ClaudeCodeCLI] Registered: {result}")
+            # Registration uses the configured API base, not discovery output,
+            # so both round-trips can overlap
+            discovery, result = await asyncio.gather(
+                self.sdk.discover_async(),
+                self.sdk.register_async(agent_display_id="claude-code-cli"),
+            )
+            logger.info("Discovered Tianshu: %s", discovery)
+            logger.info("Registered: %s", result)
 
             if not result.get("ok"):
-                print(f"[ClaudeCodeCLI] Registration failed: {result}")
+                logger.error("Registration failed: %s", result)
                 return False
 
+            # Start persistent CLI workers
+            if self.pool_size > 0:
+                await self._start_pool()
+
+            # Batch action reports to Diting
+            if self.config.auto_report_actions:
+                self._action_batcher = ActionBatcher(self.sdk.trace_batch_async)
+                self._action_batcher.start()
+
             # Start heartbeat loop
             self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
 
@@ -68,31 +103,59 @@ class ClaudeCodeCLIAdapter(CLIAdapterBase):
             return True
 
         except Exception as e:
-            print(f"[ClaudeCodeCLI] Initialization failed: {e}")
+            logger.error("Initialization failed: %s", e)
             return False
 
     async def _heartbeat_loop(self) -> None:
         """Send periodic heartbeats to Tianshu"""
+        loop = asyncio.get_running_loop()
+        interval = self.config.heartbeat_interval
+        # Fixed timeline: request latency doesn't push later heartbeats back
+        deadline = loop.time()
         while True:
             try:
-                await asyncio.sleep(self.config.heartbeat_interval)
-                result = self.sdk.heartbeat()
-                print(f"[ClaudeCodeCLI] Heartbeat: {result}")
+                deadline += interval
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+                if self._action_batcher:
+                    # Send pending actions alongside the heartbeat so both
+                    # requests share the connection (multiplexed over HTTP/2)
+                    result, _ = await asyncio.gather(
+                        self.sdk.heartbeat_async(),
+                        self._action_batcher.flush(),
+                    )
+                else:
+                    result = await self.sdk.heartbeat_async()
+                logger.debug("Heartbeat: %s", result)
+
+                now = loop.time()
+                if deadline < now:
+                    deadline = now
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"[ClaudeCodeCLI] Heartbeat failed: {e}")
+                logger.warning("Heartbeat failed: %s", e)
 
     async def execute_task(self, task: Task) -> TaskResult:
         """
         Execute a task using Claude Code CLI.
 
+        At most MAX_CONCURRENT_TASKS tasks run at once; others wait for a slot.
+
         Args:
             task: Task to execute
 
         Returns:
             TaskResult with execution outcome
         """
+        async with self._task_slots:
+            self._active_tasks += 1
+            try:
+                return await self._run_task(task)
+            finally:
+                self._active_tasks -= 1
+
+    async def _run_task(self, task: Task) -> TaskResult:
+        """Execute a task and report its lifecycle to Diting"""
         try:
             # Report task start to Diting
             if self.config.auto_report_actions:
@@ -104,8 +167,13 @@ class ClaudeCodeCLIAdapter(CLIAdapterBase):
             # Convert task to CLI command
             command = self._task_to_command(task)
 
-            # Execute via subprocess (simpler than interactive stdin/stdout)
-            result = await self._execute_command(command, task.timeout or self.config.task_timeout)
+            # Execute via pooled worker, or a fresh subprocess per task
+            timeout = task.timeout or self.config.task_timeout
+            if self._workers is not None:
+                result = await self._execute_pooled(command, timeout)
+            else:
+                on_chunk = task.metadata.get("on_chunk") if task.metadata else None
+                result = await self._execute_command(command, timeout, on_chunk=on_chunk)
 
             # Parse output
             task_result = self._parse_output(result, task)
@@ -135,43 +203,192 @@ class ClaudeCodeCLIAdapter(CLIAdapterBase):
 
             return error_result
 
-    async def _execute_command(self, command: str, timeout: int) -> str:
+    @property
+    def active_tasks(self) -> int:
+        """Number of tasks currently holding an execution slot"""
+        return self._active_tasks
+
+    async def warm_up(self) -> None:
+        """Open keep-alive connections to Tianshu and Diting ahead of the first heartbeat"""
+        await self.sdk.warm_up()
+
+    async def health_check(self) -> HealthStatus:
+        """Healthy once initialized; degraded while all task slots are busy"""
+        if not self._initialized:
+            return HealthStatus.UNHEALTHY
+        if self._active_tasks >= self.max_concurrent_tasks:
+            return HealthStatus.DEGRADED
+        return HealthStatus.HEALTHY
+
+    async def _execute_command(
+        self,
+        command: str,
+        timeout: int,
+        on_chunk: Optional[Callable[[str], Any]] = None,
+    ) -> bytes:
         """
         Execute command using subprocess.
 
+        Stdout is read incrementally rather than buffered by communicate(),
+        so callers can observe output as it arrives. The output is returned
+        undecoded; decoding is left to `_parse_output`.
+
         Args:
             command: Command to execute
             timeout: Timeout in seconds
+            on_chunk: Optional callback receiving decoded stdout chunks
 
         Returns:
-            Command output
+            Raw command output
         """
-        cmd = [self.cli_path] + self.cli_args + [command]
+        proc = await asyncio.create_subprocess_exec(
+            *self._cmd_prefix,
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        # Drain stderr concurrently so a chatty CLI can't block on a full pipe
+        stderr_reader = asyncio.ensure_future(proc.stderr.read())
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace") if on_chunk else None
+        chunks = []
 
         try:
-            proc = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
+            async with _timeout(timeout):
+                while chunk := await proc.stdout.read(_READ_CHUNK_SIZE):
+                    chunks.append(chunk)
+                    if decoder:
+                        on_chunk(decoder.decode(chunk))
+                stderr = await stderr_reader
+                await proc.wait()
+
+        except BaseException as e:
+            stderr_reader.cancel()
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            if isinstance(e, asyncio.TimeoutError):
+                raise RuntimeError(f"Command timed out after {timeout} seconds")
+            raise
+
+        if decoder:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                on_chunk(tail)
+
+        if proc.returncode != 0:
+            error = stderr.decode(errors="replace") if stderr else ""
+            raise RuntimeError(f"Command failed with code {proc.returncode}: {error}")
+
+        return b"".join(chunks)
+
+    async def _spawn_worker(self) -> asyncio.subprocess.Process:
+        """Start one long-lived CLI worker reading prompts from stdin."""
+        return await asyncio.create_subprocess_exec(
+            *self._cmd_prefix,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            limit=self.stream_limit,
+        )
 
-            stdout, stderr = await asyncio.wait_for(
-                proc.communicate(),
-                timeout=timeout,
-            )
+    async def _start_pool(self) -> None:
+        """Start CLI_POOL_SIZE workers concurrently and queue them as idle."""
+        results = await asyncio.gather(
+            *(self._spawn_worker() for _ in range(self.pool_size)),
+            return_exceptions=True,
+        )
+        procs = [r for r in results if not isinstance(r, BaseException)]
+        if len(procs) < len(results):
+            for proc in procs:
+                proc.kill()
+                await proc.wait()
+            raise next(r for r in results if isinstance(r, BaseException))
+
+        self._workers = asyncio.Queue()
+        for proc in procs:
+            self._workers.put_nowait(proc)
+
+    async def _stop_pool(self) -> None:
+        """Terminate all idle workers and fail callers waiting for one."""
+        if self._workers is None:
+            return
+        workers, self._workers = self._workers, None
+        while not workers.empty():
+            proc = workers.get_nowait()
+            if proc is not None and proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+        # Each woken waiter re-queues the marker for the next one
+        workers.put_nowait(_POOL_STOPPED)
+
+    async def _execute_pooled(self, command: str, timeout: int) -> bytes:
+        """
+        Execute command on an idle pooled worker.
 
-            output = stdout.decode() if stdout else ""
-            error = stderr.decode() if stderr else ""
+        The command is written as one line to the worker's stdin and the
+        response is read up to a line equal to CLI_POOL_SENTINEL. A worker
+        that times out or dies is discarded and lazily respawned by the next
+        caller; one still busy when the pool stops is killed on completion.
+        The timeout covers both waiting for an idle worker and the command.
 
-            if proc.returncode != 0:
-                raise RuntimeError(f"Command failed with code {proc.returncode}: {error}")
+        Args:
+            command: Command to execute
+            timeout: Timeout in seconds
 
-            return output
+        Returns:
+            Raw command output
+        """
+        workers = self._workers
+        if workers is None:
+            raise RuntimeError("CLI worker pool stopped")
 
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            async with _timeout(timeout):
+                proc = await workers.get()
         except asyncio.TimeoutError:
-            proc.kill()
-            await proc.wait()
-            raise RuntimeError(f"Command timed out after {timeout} seconds")
+            raise RuntimeError(f"Command timed out after {timeout} seconds") from None
+        if proc is _POOL_STOPPED:
+            workers.put_nowait(proc)
+            raise RuntimeError("CLI worker pool stopped")
+
+        try:
+            if proc is None or proc.returncode is not None:
+                proc = await self._spawn_worker()
+
+            async with _timeout(max(0.0, deadline - loop.time())):
+                proc.stdin.write(command.encode() + b"\n")
+                await proc.stdin.drain()
+                output = await self._read_response(proc.stdout)
+
+            return output
+
+        except BaseException as e:
+            if proc is not None and proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            proc = None
+            if isinstance(e, asyncio.TimeoutError):
+                raise RuntimeError(f"Command timed out after {timeout} seconds")
+            if isinstance(e, (asyncio.IncompleteReadError, ConnectionError)):
+                raise RuntimeError("CLI worker exited unexpectedly") from e
+            raise
+
+        finally:
+            if self._workers is workers:
+                workers.put_nowait(proc)
+            elif proc is not None and proc.returncode is None:
+                # The pool was stopped while this command ran; don't leak the worker
+                proc.kill()
+                await proc.wait()
+
+    async def shutdown(self) -> None:
+        """Stop pooled workers and flush pending reports"""
+        await self._stop_pool()
+        if self._action_batcher:
+            await self._action_batcher.stop()
+            self._action_batcher = None
+        await super().shutdown()
 
     def _task_to_command(self, task: Task) -> str:
         """
@@ -189,17 +406,20 @@ class ClaudeCodeCLIAdapter(CLIAdapterBase):
         # Simple implementation: pass task description as prompt
         return task.description
 
-    def _parse_output(self, output: str, task: Task) -> TaskResult:
+    def _parse_output(self, output: Union[str, bytes], task: Task) -> TaskResult:
         """
         Parse CLI output into TaskResult.
 
         Args:
-            output: CLI output
+            output: CLI output, raw bytes or already decoded
             task: Original task
 
         Returns:
             TaskResult
         """
+        if isinstance(output, bytes):
+            output = output.decode()
+
         # Simple implementation: treat any output as success
         return TaskResult(
             task_id=task.id,
@@ -208,12 +428,16 @@ class ClaudeCodeCLIAdapter(CLIAdapterBase):
         )
 
     async def report_action(self, action_type: str, detail: dict) -> None:
-        """Report action to Diting for audit"""
+        """Report action to Diting for audit (batched when auto_report_actions is on)"""
         try:
-            result = self.sdk.trace(action_type, **detail)
-            print(f"[ClaudeCodeCLI] Reported action {action_type}: {result}")
+            if self._action_batcher:
+                self._action_batcher.put(self.sdk.action_event(action_type, detail))
+                return
+            payload = orjson.dumps(self.sdk.action_event(action_type, detail))
+            result = await self.sdk.trace_raw(payload)
+            logger.debug("Reported action %s: %s", action_type, result)
         except Exception as e:
-            print(f"[ClaudeCodeCLI] Failed to report action: {e}")
+            logger.warning("Failed to report action: %s", e)
 
 
 # Register adapter
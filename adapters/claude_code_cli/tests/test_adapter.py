@@ -4,14 +4,11 @@ Tests for Claude Code CLI Adapter
 
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
+import asyncio
 import sys
-from pathlib import Path
-
-# Add SDK and adapters to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "sdk" / "python"))
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from ziwei_taibai.adapters.base import Task, AdapterConfig, HealthStatus
+from ziwei_taibai.adapters.batcher import ActionBatcher
 from claude_code_cli.adapter import ClaudeCodeCLIAdapter
 
 
@@ -71,10 +68,13 @@ async def test_parse_output(adapter):
     assert result.status == "success"
     assert result.output == output
 
+    result = adapter._parse_output(output.encode(), task)
+    assert result.output == output
+
 
 @pytest.mark.asyncio
-@patch('ziwei_taibai.agent.Agent.discover')
-@patch('ziwei_taibai.agent.Agent.register')
+@patch('ziwei_taibai.agent.Agent.discover_async', new_callable=AsyncMock)
+@patch('ziwei_taibai.agent.Agent.register_async', new_callable=AsyncMock)
 async def test_initialization(mock_register, mock_discover, adapter):
     """Test adapter initialization"""
     mock_discover.return_value = {"ok": True}
@@ -84,8 +84,160 @@ async def test_initialization(mock_register, mock_discover, adapter):
 
     assert success
     assert adapter.is_initialized
-    mock_discover.assert_called_once()
-    mock_register.assert_called_once()
+    mock_discover.assert_awaited_once()
+    mock_register.assert_awaited_once()
+
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_execute_command_timeout(adapter):
+    """Test command is killed when it exceeds the timeout"""
+    adapter._cmd_prefix = ("sleep",)
+
+    with pytest.raises(RuntimeError, match="timed out"):
+        await adapter._execute_command("5", timeout=0.1)
+
+
+@pytest.mark.asyncio
+async def test_execute_command_streams_chunks(adapter):
+    """Test stdout is streamed to the on_chunk callback"""
+    adapter._cmd_prefix = ("echo",)
+    chunks = []
+
+    output = await adapter._execute_command("hello", timeout=5, on_chunk=chunks.append)
+
+    assert output == b"hello\n"
+    assert "".join(chunks) == output.decode()
+
+
+@pytest.mark.asyncio
+async def test_execute_pooled(adapter):
+    """Test pooled workers are reused across commands"""
+    adapter._cmd_prefix = (
+        sys.executable, "-u", "-c",
+        "import os, sys\n"
+        "for line in sys.stdin:\n"
+        "    print(os.getpid(), line.strip())\n"
+        "    print('<END>')\n",
+    )
+    adapter.pool_size = 1
+
+    await adapter._start_pool()
+    try:
+        first = await adapter._execute_pooled("hello", timeout=5)
+        second = await adapter._execute_pooled("world", timeout=5)
+    finally:
+        await adapter._stop_pool()
+
+    pid, text = first.split()
+    assert text == b"hello"
+    assert second.split() == [pid, b"world"]
+
+
+@pytest.mark.asyncio
+async def test_execute_pooled_sentinel_must_be_whole_line(adapter):
+    """Test a sentinel embedded at the end of a longer line doesn't end the response"""
+    adapter._cmd_prefix = (
+        sys.executable, "-u", "-c",
+        "import sys\n"
+        "for line in sys.stdin:\n"
+        "    print('foo<END>')\n"
+        "    print('<END>')\n",
+    )
+    adapter.pool_size = 1
+
+    await adapter._start_pool()
+    try:
+        output = await adapter._execute_pooled("hello", timeout=5)
+    finally:
+        await adapter._stop_pool()
+
+    assert output == b"foo<END>\n"
+
+
+@pytest.mark.asyncio
+async def test_stop_pool_kills_busy_worker(adapter):
+    """Test a worker still running a command when the pool stops is killed"""
+    adapter._cmd_prefix = (
+        sys.executable, "-u", "-c",
+        "import sys, time\n"
+        "for line in sys.stdin:\n"
+        "    time.sleep(0.3)\n"
+        "    print('<END>')\n",
+    )
+    adapter.pool_size = 1
+
+    await adapter._start_pool()
+    proc = adapter._workers._queue[0]
+    task = asyncio.create_task(adapter._execute_pooled("hello", timeout=5))
+    await asyncio.sleep(0.1)
+    await adapter._stop_pool()
+
+    assert await task == b""
+    assert proc.returncode is not None
+
+
+@pytest.mark.asyncio
+async def test_stop_pool_fails_waiting_callers(adapter):
+    """Test callers waiting for a worker when the pool stops are released"""
+    adapter._cmd_prefix = (
+        sys.executable, "-u", "-c",
+        "import sys, time\n"
+        "for line in sys.stdin:\n"
+        "    time.sleep(0.3)\n"
+        "    print('<END>')\n",
+    )
+    adapter.pool_size = 1
+
+    await adapter._start_pool()
+    busy = asyncio.create_task(adapter._execute_pooled("hello", timeout=5))
+    waiters = [
+        asyncio.create_task(adapter._execute_pooled("world", timeout=5))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0.1)
+    await adapter._stop_pool()
+
+    for waiter in waiters:
+        with pytest.raises(RuntimeError, match="pool stopped"):
+            await asyncio.wait_for(waiter, timeout=1)
+    assert await busy == b""
+
+
+@pytest.mark.asyncio
+async def test_execute_pooled_wait_counts_toward_timeout(adapter):
+    """Test waiting for an idle worker is bounded by the command timeout"""
+    adapter._cmd_prefix = (sys.executable, "-c", "import time; time.sleep(30)")
+    adapter.pool_size = 1
+
+    await adapter._start_pool()
+    busy = asyncio.create_task(adapter._execute_pooled("hello", timeout=5))
+    try:
+        with pytest.raises(RuntimeError, match="timed out"):
+            await adapter._execute_pooled("world", timeout=0.1)
+    finally:
+        busy.cancel()
+        await asyncio.gather(busy, return_exceptions=True)
+        await adapter._stop_pool()
+
+
+@pytest.mark.asyncio
+async def test_report_action_batched(adapter):
+    """Test action reports are sent to Diting in one batch"""
+    send = AsyncMock()
+    adapter.sdk._agent_id = "test-agent-123"
+    adapter._action_batcher = ActionBatcher(send)
+    adapter._action_batcher.start()
+
+    await adapter.report_action("task_start", {"task_id": "t1"})
+    await adapter.report_action("task_complete", {"task_id": "t1", "status": "success"})
+    await adapter._action_batcher.stop()
+
+    send.assert_awaited_once()
+    events = send.await_args.args[0]
+    assert [e["action_type"] for e in events] == ["task_start", "task_complete"]
+    assert events[0]["agent_id"] == "test-agent-123"
 
 
 @pytest.mark.asyncio
@@ -95,5 +247,15 @@ async def test_health_check_not_initialized(adapter):
     assert health == HealthStatus.UNHEALTHY
 
 
+@pytest.mark.asyncio
+async def test_health_check_degraded_when_saturated(adapter):
+    """Test health check reports degraded while all task slots are busy"""
+    adapter._initialized = True
+    assert await adapter.health_check() == HealthStatus.HEALTHY
+
+    adapter._active_tasks = adapter.max_concurrent_tasks
+    assert await adapter.health_check() == HealthStatus.DEGRADED
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
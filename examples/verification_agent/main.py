@@ -3,23 +3,28 @@
 # 用于集成验证；全部成功退出码 0，否则非 0
 
 import os
+import re
 import sys
 
-# 允许从 taibai 根目录或 examples/verification_agent 运行
-_taibai_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-_sdk_path = os.path.join(_taibai_root, "sdk", "python")
-if _sdk_path not in sys.path:
-    sys.path.insert(0, _sdk_path)
+# KEY=value / KEY="value" / KEY='value'；注释行与空行不匹配
+_ENV_RE = re.compile(
+    r"""^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(?:"([^"\n]*)"|'([^'\n]*)'|(.*?))[ \t]*$""",
+    re.MULTILINE,
+)
 
-# 加载 .env（若存在）
+# 加载 .env（若存在）；已设置的环境变量优先
 _env = os.path.join(os.path.dirname(__file__), ".env")
 if os.path.isfile(_env):
-    with open(_env) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                k, v = line.split("=", 1)
-                os.environ.setdefault(k.strip(), v.strip().strip('"').strip("'"))
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        # 未安装 python-dotenv 时的简易解析：整文件读取一次，正则提取
+        with open(_env) as f:
+            for m in _ENV_RE.finditer(f.read()):
+                v = m[2] if m[2] is not None else m[3] if m[3] is not None else m[4]
+                os.environ.setdefault(m[1], v)
+    else:
+        load_dotenv(_env, override=False)
 
 from ziwei_taibai import Agent, discover_tianshu, report_action, heartbeat
 from ziwei_taibai.protocol import ACTION_VERIFICATION_PING
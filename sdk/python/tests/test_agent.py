@@ -0,0 +1,105 @@
+"""
+Tests for the Agent HTTP helpers
+"""
+
+import asyncio
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import orjson
+import pytest
+
+from ziwei_taibai import agent
+
+
+class RecordingServer(ThreadingHTTPServer):
+    """Local HTTP server answering every POST with {"ok": true}"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        self.requests = []
+        super().__init__(("127.0.0.1", 0), _Handler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so pooled connections are actually reused
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests.append((self.path, orjson.loads(body)))
+        payload = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = RecordingServer()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_async_client_survives_new_event_loop(server):
+    """The shared AsyncClient is recreated for each event loop"""
+    async def post():
+        return await agent._apost(server.url + "/ping", b"{}", 5, "ping")
+
+    assert asyncio.run(post()) == {"ok": True}
+    assert asyncio.run(post()) == {"ok": True}
+    assert len(server.requests) == 2
+
+
+def test_audit_events_are_batched_per_url(server):
+    """Queued events go out as one /bulk POST per audit URL, in order"""
+    for i in range(6):
+        agent.report_action_nowait(server.url + "/a", "agent-1", "exec", {"i": i})
+    for i in range(2):
+        agent.report_action_nowait(server.url + "/b/", "agent-2", "write", {"i": i})
+    agent.flush_audit()
+
+    bulk = dict(server.requests)
+    assert sorted(bulk) == ["/a/bulk", "/b/bulk"]
+    assert [e["detail"]["i"] for e in bulk["/a/bulk"]["events"]] == list(range(6))
+    assert [e["detail"]["i"] for e in bulk["/b/bulk"]["events"]] == [0, 1]
+    assert {e["agent_id"] for e in bulk["/b/bulk"]["events"]} == {"agent-2"}
+
+
+def test_audit_batches_are_capped(server):
+    """A backlog larger than one batch is split into several POSTs"""
+    for i in range(agent._AUDIT_BATCH_SIZE + 20):
+        agent.report_action_nowait(server.url, "agent-1", "exec", {"i": i})
+    agent.flush_audit()
+
+    sizes = [len(body["events"]) for _, body in server.requests]
+    assert sizes == [agent._AUDIT_BATCH_SIZE, 20]
+
+
+def test_full_audit_queue_reports_synchronously(server, monkeypatch):
+    """When the queue is full the caller sends the event itself"""
+    def full(item):
+        raise queue.Full
+
+    monkeypatch.setattr(agent._audit_queue, "put_nowait", full)
+    agent.report_action_nowait(server.url, "agent-1", "exec", {"i": 0})
+
+    # No flush needed: the POST already happened on the calling thread
+    assert len(server.requests) == 1
+    path, body = server.requests[0]
+    assert path == "/bulk"
+    assert [e["detail"] for e in body["events"]] == [{"i": 0}]
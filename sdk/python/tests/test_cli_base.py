@@ -0,0 +1,58 @@
+"""
+Tests for CLIAdapterBase.send_command
+"""
+
+import sys
+
+import pytest
+
+from ziwei_taibai.adapters.base import AdapterConfig
+from ziwei_taibai.adapters.cli_base import CLIAdapterBase
+
+
+class EchoAdapter(CLIAdapterBase):
+    """CLI adapter driving a Python script as the CLI"""
+
+    def __init__(self, script):
+        config = AdapterConfig(
+            adapter_type="echo",
+            owner_id="test@example.com",
+            tianshu_api_base="http://localhost:8082",
+        )
+        super().__init__(config, sys.executable, ["-u", "-c", script])
+
+    async def initialize(self):
+        return True
+
+    async def execute_task(self, task):
+        raise NotImplementedError
+
+
+@pytest.mark.asyncio
+async def test_send_command_requires_whole_line_sentinel():
+    """A sentinel at the end of a longer line doesn't end the response"""
+    adapter = EchoAdapter(
+        "import sys\n"
+        "for line in sys.stdin:\n"
+        "    print(line.strip() + '<END>')\n"
+        "    print('<END>')\n"
+    )
+    await adapter.start_process()
+    try:
+        assert await adapter.send_command("hello", timeout=5) == "hello<END>\n"
+        assert await adapter.send_command("world", timeout=5) == "world<END>\n"
+    finally:
+        await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_send_command_timeout_kills_process():
+    """A CLI that never answers times out and is killed"""
+    adapter = EchoAdapter("import time; time.sleep(30)")
+    await adapter.start_process()
+    try:
+        with pytest.raises(RuntimeError, match="timed out"):
+            await adapter.send_command("hello", timeout=0.1)
+        assert adapter.process.returncode is not None
+    finally:
+        await adapter.shutdown()
@@ -0,0 +1,78 @@
+"""
+Tests for AdapterConfig
+"""
+
+import copy
+import dataclasses
+import pickle
+
+import pytest
+
+from ziwei_taibai.adapters.base import AdapterConfig
+from ziwei_taibai.config import load_config_from_file
+
+
+@pytest.fixture
+def config():
+    return AdapterConfig(
+        adapter_type="claude-code-cli",
+        owner_id="test@example.com",
+        tianshu_api_base="http://localhost:8082",
+        extra={"CLI_POOL_SIZE": "2", "task_timeout": 60},
+    )
+
+
+def test_get_prefers_extra_over_fields(config):
+    """get() checks extra before the dataclass fields"""
+    assert config.get("CLI_POOL_SIZE") == "2"
+    assert config.get("task_timeout") == 60
+    assert config.get("owner_id") == "test@example.com"
+    assert config.get("missing", "default") == "default"
+
+
+def test_fields_are_frozen(config):
+    """Fields cannot be reassigned; replace() derives a new config"""
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.heartbeat_interval = 10
+    assert dataclasses.replace(config, heartbeat_interval=10).get("heartbeat_interval") == 10
+
+
+def test_get_tracks_extra(config):
+    """get() never returns a stale value after extra changes"""
+    config.extra["CLI_POOL_SIZE"] = "4"
+    assert config.get("CLI_POOL_SIZE") == "4"
+    del config.extra["task_timeout"]
+    assert config.get("task_timeout") == 300
+
+
+def test_extra_is_copied(config):
+    """The dict passed in is not shared with the config"""
+    extra = {"X": 1}
+    cfg = AdapterConfig("t", "o", "http://x", extra=extra)
+    extra["X"] = 2
+    assert cfg.get("X") == 1
+
+
+def test_pickle_deepcopy_asdict_round_trip(config):
+    """Configs can be pickled, deep-copied and converted to dicts"""
+    assert pickle.loads(pickle.dumps(config)) == config
+    assert copy.deepcopy(config) == config
+    data = dataclasses.asdict(config)
+    assert data["extra"] == {"CLI_POOL_SIZE": "2", "task_timeout": 60}
+    assert AdapterConfig(**data) == config
+
+
+def test_load_config_from_file_hands_out_copies(tmp_path):
+    """Mutating one loaded config's extra doesn't affect the cached one"""
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        "adapter:\n"
+        "  type: claude-code-cli\n"
+        "  owner_id: test@example.com\n"
+        "  tianshu_api_base: http://localhost:8082\n"
+        "  CLI_POOL_SIZE: 2\n"
+    )
+    first = load_config_from_file(str(path))
+    first.extra["CLI_POOL_SIZE"] = 8
+    second = load_config_from_file(str(path))
+    assert second.get("CLI_POOL_SIZE") == 2
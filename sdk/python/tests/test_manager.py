@@ -0,0 +1,144 @@
+"""
+Tests for AdapterManager / AdapterFleetManager health handling
+"""
+
+import asyncio
+
+import pytest
+
+from ziwei_taibai import agent
+from ziwei_taibai.adapters.base import AdapterConfig, AgentAdapter, HealthStatus, TaskResult
+from ziwei_taibai.manager import AdapterFleetManager, AdapterManager
+
+
+class FakeAdapter(AgentAdapter):
+    """Adapter whose health and initialize latency are set by the test"""
+
+    def __init__(self, health=HealthStatus.HEALTHY, init_delay=0.0):
+        super().__init__(AdapterConfig(
+            adapter_type="fake",
+            owner_id="test@example.com",
+            tianshu_api_base="http://localhost:8082",
+            heartbeat_interval=1,
+        ))
+        self.health = health
+        self.init_delay = init_delay
+        self.checks = 0
+        self.initializations = 0
+        self.shutdowns = 0
+
+    async def initialize(self) -> bool:
+        self.initializations += 1
+        await asyncio.sleep(self.init_delay)
+        return True
+
+    async def execute_task(self, task):
+        return TaskResult(task_id=task.id, status="success")
+
+    async def health_check(self) -> HealthStatus:
+        self.checks += 1
+        return self.health
+
+    async def shutdown(self) -> None:
+        self.shutdowns += 1
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_restart_runs_in_background():
+    """check_health returns immediately and skips the adapter while it restarts"""
+    adapter = FakeAdapter(HealthStatus.UNHEALTHY, init_delay=60)
+    manager = AdapterManager(adapter, health_monitor=False)
+
+    status = await asyncio.wait_for(manager.check_health(1.0), timeout=0.5)
+    assert status == HealthStatus.UNHEALTHY
+    assert manager.restarting
+
+    # A second check while restarting neither probes nor restarts again
+    assert await manager.check_health(1.0) == HealthStatus.UNHEALTHY
+    assert adapter.checks == 1
+
+    await manager.stop()
+    assert not manager.restarting
+
+
+@pytest.mark.asyncio
+async def test_restart_backoff_doubles_and_resets():
+    """Consecutive restarts back off exponentially; a healthy check resets"""
+    adapter = FakeAdapter(HealthStatus.UNHEALTHY)
+    manager = AdapterManager(adapter, health_monitor=False)
+    manager._restart_backoff = 0.001
+
+    await manager.check_health()
+    await manager._restart_task
+    assert adapter.initializations == 1
+    assert manager._restart_backoff == 0.002
+
+    adapter.health = HealthStatus.HEALTHY
+    await manager.check_health()
+    assert manager._restart_backoff == 1.0
+
+
+@pytest.mark.asyncio
+async def test_fleet_tick_not_blocked_by_restarting_adapter():
+    """One adapter's restart doesn't stall health checks for the others"""
+    sick = FakeAdapter(HealthStatus.UNHEALTHY)
+    well = FakeAdapter()
+    fleet = AdapterFleetManager([sick, well], interval=0.01, check_timeout=0.05)
+    await fleet.start()
+    # Reinitialization hangs, so the restart stays in progress
+    sick.init_delay = 60
+    try:
+        await asyncio.sleep(0.2)
+        assert fleet.managers[0].restarting
+        assert sick.checks == 1
+        assert well.checks >= 5
+    finally:
+        await fleet.stop()
+    assert not fleet.managers[0].restarting
+
+
+@pytest.mark.asyncio
+async def test_fleet_check_timeout_reports_degraded():
+    """A health check that exceeds check_timeout is DEGRADED, not a restart"""
+    adapter = FakeAdapter()
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    adapter.health_check = hang
+    manager = AdapterManager(adapter, health_monitor=False)
+    status = await asyncio.wait_for(manager.check_health(0.01), timeout=0.5)
+    assert status == HealthStatus.DEGRADED
+    assert not manager.restarting
+
+
+@pytest.mark.asyncio
+async def test_fleet_closes_shared_client_after_all_adapters_stop():
+    """The shared AsyncClient stays open until the last adapter has shut down"""
+    client = agent._get_async_client()
+    seen_open = []
+
+    class ClientCheckingAdapter(FakeAdapter):
+        async def shutdown(self) -> None:
+            await asyncio.sleep(0)
+            seen_open.append(not client.is_closed)
+
+    fleet = AdapterFleetManager(
+        [ClientCheckingAdapter(), ClientCheckingAdapter()], interval=60, owns_clients=True
+    )
+    await fleet.start()
+    await fleet.stop()
+
+    assert seen_open == [True, True]
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_manager_leaves_shared_client_open_by_default():
+    """Stopping a manager doesn't close clients other Agent users may share"""
+    client = agent._get_async_client()
+    manager = AdapterManager(FakeAdapter(), health_monitor=False)
+    await manager.start()
+    await manager.stop()
+    assert not client.is_closed
+    await agent.close_async_client()
@@ -0,0 +1,180 @@
+"""
+Tests for MessageAPI paging and SubscriptionManager
+"""
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from ziwei_taibai.http_client import HTTPResponse
+from ziwei_taibai.message import MessageAPI, SubscriptionManager
+
+
+class FakeWS:
+    """Records frames sent by the SubscriptionManager"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, data):
+        self.sent.append(data)
+
+
+def _event(event_type, **fields):
+    return SimpleNamespace(data={"type": event_type, **fields})
+
+
+@pytest.fixture
+def ws():
+    return FakeWS()
+
+
+@pytest.fixture
+def subs(ws):
+    return SubscriptionManager(ws)
+
+
+@pytest.mark.asyncio
+async def test_only_first_subscriber_sends_subscribe(ws, subs):
+    """Additional callbacks for the same event don't resend subscribe"""
+    async def on_async(data):
+        pass
+
+    await subs.subscribe("chat", lambda data: None)
+    await subs.subscribe("chat", on_async)
+    await subs.subscribe("chat", lambda data: None)
+    await subs.subscribe("presence", lambda data: None)
+
+    assert ws.sent == [
+        {"type": "subscribe", "event_type": "chat"},
+        {"type": "subscribe", "event_type": "presence"},
+    ]
+    assert sorted(subs.subscribed_events) == ["chat", "presence"]
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_single_callback(ws, subs):
+    """Removing one callback keeps the others; removing the last sends unsubscribe"""
+    seen = []
+
+    async def on_async(data):
+        seen.append(("async", data["n"]))
+
+    def on_sync(data):
+        seen.append(("sync", data["n"]))
+
+    await subs.subscribe("chat", on_sync)
+    await subs.subscribe("chat", on_async)
+
+    await subs.unsubscribe("chat", on_sync)
+    assert {"type": "unsubscribe", "event_type": "chat"} not in ws.sent
+    subs.handle_message(_event("chat", n=1))
+    await asyncio.sleep(0)
+    assert seen == [("async", 1)]
+
+    await subs.unsubscribe("chat", on_async)
+    assert ws.sent[-1] == {"type": "unsubscribe", "event_type": "chat"}
+    assert subs.subscribed_events == []
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_all_callbacks(ws, subs):
+    """unsubscribe() without a callback drops every callback for the event"""
+    await subs.subscribe("chat", lambda data: None)
+    await subs.subscribe("chat", lambda data: None)
+    await subs.unsubscribe("chat")
+    assert ws.sent[-1] == {"type": "unsubscribe", "event_type": "chat"}
+    assert subs.subscribed_events == []
+
+
+@pytest.mark.asyncio
+async def test_callback_errors_are_logged(subs, caplog):
+    """Errors from sync and async callbacks are logged and don't stop dispatch"""
+    seen = []
+
+    def failing(data):
+        raise ValueError("sync boom")
+
+    async def async_failing(data):
+        raise ValueError("async boom")
+
+    await subs.subscribe("chat", failing)
+    await subs.subscribe("chat", seen.append)
+    await subs.subscribe("chat", async_failing)
+
+    subs.handle_message(_event("chat"))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert seen == [{"type": "chat"}]
+    assert not subs._pending
+    errors = [r.getMessage() for r in caplog.records if r.levelno == logging.ERROR]
+    assert errors == [
+        "Subscription callback error: sync boom",
+        "Subscription callback error: async boom",
+    ]
+
+
+class FakeMessagesHTTP:
+    """Serves `total` messages, capping each page at `max_limit`"""
+
+    def __init__(self, total, max_limit):
+        self.total = total
+        self.max_limit = max_limit
+        self.requests = []
+        self.cancelled = 0
+
+    async def get(self, path, params=None, **kwargs):
+        self.requests.append((params["offset"], params["limit"]))
+        try:
+            await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        start = params["offset"]
+        end = min(start + min(params["limit"], self.max_limit), self.total)
+        messages = [
+            {"id": str(i), "room_id": "r1", "sender": "u1", "content": f"m{i}"}
+            for i in range(start, end)
+        ]
+        return HTTPResponse(200, {"messages": messages})
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_follows_server_page_cap():
+    """Paging advances by what the server returned and stops on an empty page"""
+    http = FakeMessagesHTTP(total=120, max_limit=50)
+    api = MessageAPI(http)
+
+    ids = [m.id async for m in api.iter_messages(page_size=500)]
+
+    assert ids == [str(i) for i in range(120)]
+    assert http.requests == [(0, 500), (50, 500), (100, 500), (120, 500)]
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_prefetches_and_cancels_on_break():
+    """The next page is requested before the current one is consumed; break cancels it"""
+    http = FakeMessagesHTTP(total=1000, max_limit=50)
+    api = MessageAPI(http)
+
+    ids = []
+    iterator = api.iter_messages(page_size=50)
+    async for msg in iterator:
+        ids.append(msg.id)
+        if len(ids) == 1:
+            # First page delivered; the second is already in flight
+            await asyncio.sleep(0)
+            assert http.requests == [(0, 50), (50, 50)]
+        if len(ids) == 60:
+            # Let the third page's request start so break has something to cancel
+            await asyncio.sleep(0)
+            break
+    await iterator.aclose()
+    await asyncio.sleep(0)
+
+    assert ids == [str(i) for i in range(60)]
+    assert http.requests == [(0, 50), (50, 50), (100, 50)]
+    assert http.cancelled == 1
@@ -0,0 +1,259 @@
+"""
+Tests for RoomAPI caching
+"""
+
+import asyncio
+
+import pytest
+
+from ziwei_taibai.http_client import HTTPClientError, HTTPResponse
+from ziwei_taibai.room import RoomAPI
+
+
+class FakeHTTP:
+    """In-memory stand-in for HTTPClient serving /api/rooms"""
+
+    def __init__(self):
+        self.rooms = {"r1": {"id": "r1", "name": "old", "owner": "u1", "members": ["u1"]}}
+        self.gets = []
+        # When set, GET responses are held until the event fires; the
+        # response still reflects server state at the time of the request
+        self.gate = None
+
+    async def get(self, path, params=None, **kwargs):
+        self.gets.append((path, params))
+        if path == "/api/rooms":
+            if params and "ids" in params:
+                ids = params["ids"].split(",")
+                data = {"rooms": [dict(self.rooms[i]) for i in ids if i in self.rooms]}
+            else:
+                data = {"rooms": [dict(r) for r in self.rooms.values()]}
+        else:
+            room = self.rooms.get(path.rsplit("/", 1)[1])
+            if room is None:
+                return HTTPResponse(404, {"error": "not found"})
+            data = dict(room)
+        if self.gate is not None:
+            await self.gate.wait()
+        return HTTPResponse(200, data)
+
+    def _room(self, path):
+        return self.rooms[path.split("/")[3]]
+
+    async def post(self, path, data=None, **kwargs):
+        if path == "/api/rooms":
+            room = {"id": f"r{len(self.rooms) + 1}", "name": data["name"], "owner": "u1", "members": []}
+            self.rooms[room["id"]] = room
+            return HTTPResponse(200, dict(room))
+        room = self._room(path)
+        room["members"] = room["members"] + [data["user_id"]]
+        return HTTPResponse(200, dict(room))
+
+    async def put(self, path, data=None, **kwargs):
+        room = self._room(path)
+        room.update(data)
+        return HTTPResponse(200, dict(room))
+
+    async def post_status(self, path, data=None, **kwargs):
+        room = self._room(path)
+        room["members"] = [m for m in room["members"] if m != data["user_id"]]
+        return HTTPResponse(200, None)
+
+    async def delete_status(self, path, data=None, **kwargs):
+        parts = path.split("/")
+        room = self._room(path)
+        if len(parts) > 4:
+            room["members"] = [m for m in room["members"] if m != parts[5]]
+        else:
+            room["name"] = "deleted"
+        return HTTPResponse(200, None)
+
+
+async def _requests_sent(http, count):
+    """Yield to the loop until `count` GETs have reached the fake server"""
+    for _ in range(100):
+        if len(http.gets) >= count:
+            return
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def http():
+    return FakeHTTP()
+
+
+@pytest.mark.asyncio
+async def test_get_room_cache_hit(http):
+    """Repeated get_room within the TTL is served from the cache"""
+    api = RoomAPI(http)
+    first = await api.get_room("r1")
+    second = await api.get_room("r1")
+    assert second is first
+    assert len(http.gets) == 1
+
+
+@pytest.mark.asyncio
+async def test_list_rooms_cache_hit_returns_copy(http):
+    """Cached list results are returned as fresh lists"""
+    api = RoomAPI(http)
+    first = await api.list_rooms()
+    first.clear()
+    second = await api.list_rooms()
+    assert [r.id for r in second] == ["r1"]
+    assert len(http.gets) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_expiry(http):
+    """Entries are refetched once the TTL has passed"""
+    api = RoomAPI(http, cache_ttl=0.01)
+    await api.get_room("r1")
+    await api.list_rooms()
+    await asyncio.sleep(0.02)
+    await api.get_room("r1")
+    await api.list_rooms()
+    assert len(http.gets) == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled(http):
+    """cache_ttl=0 turns caching off"""
+    api = RoomAPI(http, cache_ttl=0)
+    await api.get_room("r1")
+    await api.get_room("r1")
+    assert len(http.gets) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mutate", [
+    lambda api: api.join_room("r1", "u2"),
+    lambda api: api.leave_room("r1", "u1"),
+    lambda api: api.add_member("r1", "u2"),
+    lambda api: api.remove_member("r1", "u1"),
+    lambda api: api.update_room("r1", name="new"),
+    lambda api: api.delete_room("r1"),
+])
+async def test_mutation_invalidates_room_and_lists(http, mutate):
+    """Every room mutation drops the room entry and all list entries"""
+    api = RoomAPI(http)
+    await api.get_room("r1")
+    await api.list_rooms()
+    await mutate(api)
+    room = await api.get_room("r1")
+    rooms = await api.list_rooms()
+    assert len(http.gets) == 4
+    assert room == rooms[0]
+    assert room.name == http.rooms["r1"]["name"]
+    assert room.members == http.rooms["r1"]["members"]
+
+
+@pytest.mark.asyncio
+async def test_create_room_invalidates_lists_only(http):
+    """create_room keeps cached rooms but drops cached lists"""
+    api = RoomAPI(http)
+    await api.get_room("r1")
+    await api.list_rooms()
+    await api.create_room("second")
+    await api.get_room("r1")
+    rooms = await api.list_rooms()
+    assert len(http.gets) == 3
+    assert [r.name for r in rooms] == ["old", "second"]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_cache_all(http):
+    """invalidate_cache() with no room id drops every entry"""
+    api = RoomAPI(http)
+    await api.get_room("r1")
+    await api.list_rooms()
+    api.invalidate_cache()
+    await api.get_room("r1")
+    await api.list_rooms()
+    assert len(http.gets) == 4
+
+
+@pytest.mark.asyncio
+async def test_fetch_started_before_mutation_is_not_cached(http):
+    """A read that races a mutation must not write its stale result to the cache"""
+    api = RoomAPI(http)
+    http.gate = asyncio.Event()
+    room_read = asyncio.create_task(api.get_room("r1"))
+    list_read = asyncio.create_task(api.list_rooms())
+    await _requests_sent(http, 2)
+    await api.update_room("r1", name="new")
+    http.gate.set()
+    await asyncio.gather(room_read, list_read)
+    http.gate = None
+
+    assert (await api.get_room("r1")).name == "new"
+    assert (await api.list_rooms())[0].name == "new"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_one_request(http):
+    """Concurrent reads for the same key are coalesced"""
+    api = RoomAPI(http, cache_ttl=0)
+    rooms = await asyncio.gather(*(api.get_room("r1") for _ in range(5)))
+    lists = await asyncio.gather(*(api.list_rooms() for _ in range(3)))
+    assert len(http.gets) == 2
+    assert all(r is rooms[0] for r in rooms)
+    assert lists[0] == lists[1] and lists[0] is not lists[1]
+
+
+@pytest.mark.asyncio
+async def test_read_after_own_write_does_not_join_older_fetch(http):
+    """A read issued after a mutation must not join a fetch started before it"""
+    api = RoomAPI(http)
+    http.gate = asyncio.Event()
+    stale_room = asyncio.create_task(api.get_room("r1"))
+    stale_list = asyncio.create_task(api.list_rooms())
+    await _requests_sent(http, 2)
+    await api.update_room("r1", name="new")
+    fresh_room = asyncio.create_task(api.get_room("r1"))
+    fresh_list = asyncio.create_task(api.list_rooms())
+    await _requests_sent(http, 4)
+    http.gate.set()
+
+    assert (await stale_room).name == "old"
+    assert (await stale_list)[0].name == "old"
+    assert (await fresh_room).name == "new"
+    assert (await fresh_list)[0].name == "new"
+    assert (await api.get_room("r1")).name == "new"
+    assert len(http.gets) == 4
+
+
+@pytest.mark.asyncio
+async def test_batched_get_room_flushes_after_window(http):
+    """get_room calls inside the batch window become one bulk request"""
+    http.rooms.update({f"r{i}": {"id": f"r{i}"} for i in range(2, 6)})
+    api = RoomAPI(http, cache_ttl=0, batch_window=0.005)
+    rooms = await asyncio.gather(*(api.get_room(f"r{i}") for i in range(1, 6)))
+    assert [r.id for r in rooms] == ["r1", "r2", "r3", "r4", "r5"]
+    assert http.gets == [("/api/rooms", {"ids": "r1,r2,r3,r4,r5"})]
+    assert not api._batcher._tasks
+
+
+@pytest.mark.asyncio
+async def test_batched_get_room_flushes_at_64_ids(http):
+    """A full batch is sent without waiting for the window"""
+    http.rooms.update({f"r{i}": {"id": f"r{i}"} for i in range(100)})
+    api = RoomAPI(http, cache_ttl=0, batch_window=60)
+    rooms = await asyncio.wait_for(
+        asyncio.gather(*(api.get_room(f"r{i}") for i in range(64))),
+        timeout=1,
+    )
+    assert len(rooms) == 64
+    assert len(http.gets) == 1
+    assert len(http.gets[0][1]["ids"].split(",")) == 64
+
+
+@pytest.mark.asyncio
+async def test_batched_get_room_missing_id_raises_404(http):
+    """Ids absent from the bulk response fail with a 404 HTTPClientError"""
+    api = RoomAPI(http, cache_ttl=0, batch_window=0.005)
+    found, missing = await asyncio.gather(
+        api.get_room("r1"), api.get_room("nope"), return_exceptions=True
+    )
+    assert found.id == "r1"
+    assert isinstance(missing, HTTPClientError)
+    assert missing.status == 404
@@ -0,0 +1,180 @@
+"""
+Tests for WSClient against an in-process aiohttp server
+"""
+
+import asyncio
+import logging
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from ziwei_taibai.ws_client import ConnectionState, WSClient
+
+
+class FakeWSServer:
+    """WebSocket server that sends `frames` on connect and records what it receives"""
+
+    def __init__(self):
+        self.frames = []
+        self.received = []
+        self.url = None
+        self._runner = None
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        for frame in self.frames:
+            if isinstance(frame, bytes):
+                await ws.send_bytes(frame)
+            else:
+                await ws.send_str(frame)
+        async for msg in ws:
+            self.received.append(msg.data)
+        return ws
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/ws", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/ws"
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def server():
+    srv = FakeWSServer()
+    await srv.start()
+    yield srv
+    await srv.stop()
+
+
+async def _wait_for(predicate, timeout=1.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_close_releases_own_session(server):
+    """A client closes the session it created; reconnects reuse it until then"""
+    client = WSClient(server.url, reconnect_delay=0.01)
+    async with client:
+        session, old_ws = client._session, client._ws
+        await old_ws.close()
+        await _wait_for(
+            lambda: client._ws is not old_ws and client.state == ConnectionState.CONNECTED
+        )
+        assert client._session is session
+    assert session.closed
+    assert client._session is None
+
+
+@pytest.mark.asyncio
+async def test_close_leaves_injected_session_open(server):
+    """A session passed in by the caller is not closed by the client"""
+    async with aiohttp.ClientSession() as session:
+        async with WSClient(server.url, session=session):
+            pass
+        assert not session.closed
+
+
+async def _collect(server, frames, count, **kwargs):
+    """Connect, gather `count` dispatched messages, then close"""
+    server.frames = frames
+    client = WSClient(server.url, **kwargs)
+    received = []
+    client.on_message(received.append)
+    async with client:
+        await _wait_for(lambda: len(received) >= count)
+    return received
+
+
+@pytest.mark.asyncio
+async def test_receive_decodes_text_and_binary_frames(server):
+    """JSON objects/arrays are parsed from TEXT and BINARY frames; other payloads stay raw"""
+    received = await _collect(
+        server,
+        ['{"type": "hello"}', b'[1, 2]', "not json", "42", b"\x00\x01"],
+        5,
+    )
+    assert [(m.type, m.data) for m in received] == [
+        ("text", {"type": "hello"}),
+        ("binary", [1, 2]),
+        ("text", "not json"),
+        # Scalars are not probed as JSON
+        ("text", "42"),
+        ("binary", b"\x00\x01"),
+    ]
+    assert received[0].raw == '{"type": "hello"}'
+    assert received[1].raw == "[1, 2]"
+
+
+@pytest.mark.asyncio
+async def test_malformed_json_is_passed_raw_and_sampled_in_logs(server, caplog):
+    """Frames that look like JSON but don't parse are dispatched raw; logging is sampled"""
+    caplog.set_level(logging.DEBUG, logger="ziwei_taibai.ws_client")
+    received = await _collect(server, ["{bad"] * 101, 101)
+
+    assert all(m.data == "{bad" for m in received)
+    logged = [r for r in caplog.records if "Malformed JSON frame" in r.getMessage()]
+    assert len(logged) == 2
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_callbacks(server, caplog):
+    """Async callbacks run as tasks; a failing callback doesn't stop the others"""
+    server.frames = ['{"n": 1}']
+    client = WSClient(server.url)
+    sync_seen, async_seen = [], []
+
+    def failing(msg):
+        raise ValueError("sync boom")
+
+    async def async_cb(msg):
+        await asyncio.sleep(0)
+        async_seen.append(msg.data)
+
+    async def async_failing(msg):
+        raise ValueError("async boom")
+
+    client.on_message(failing)
+    client.on_message(sync_seen.append)
+    client.on_message(async_cb)
+    client.on_message(async_failing)
+    async with client:
+        await _wait_for(lambda: sync_seen and async_seen)
+        await _wait_for(lambda: not client._callback_tasks)
+
+    assert sync_seen[0].data == {"n": 1}
+    assert async_seen == [{"n": 1}]
+    errors = [r.getMessage() for r in caplog.records if r.levelno == logging.ERROR]
+    assert any("sync boom" in e for e in errors)
+    assert any("async boom" in e for e in errors)
+
+
+@pytest.mark.asyncio
+async def test_sends_and_heartbeat(server):
+    """send/send_prepared/send_text reach the server; heartbeats are sent on the timer"""
+    client = WSClient(server.url, heartbeat_interval=0.05)
+    async with client:
+        await client.send({"type": "a"})
+        await client.send_prepared(b'{"type":"b"}')
+        await client.send_text("c")
+        await _wait_for(
+            lambda: any(m.startswith('{"type":"heartbeat","timestamp":') for m in server.received)
+        )
+
+    assert server.received[:3] == ['{"type":"a"}', '{"type":"b"}', "c"]
+    with pytest.raises(ConnectionError):
+        await client.send({"type": "d"})
@@ -12,7 +12,17 @@ from .protocol import (
     ACTION_FILE_WRITE,
     ACTION_VERIFICATION_PING,
 )
-from .agent import Agent, discover_tianshu, report_action, heartbeat, register_agent
+from .agent import (
+    Agent,
+    close_async_client,
+    close_session,
+    discover_tianshu,
+    report_action,
+    report_action_nowait,
+    flush_audit,
+    heartbeat,
+    register_agent,
+)
 
 __all__ = [
     "Agent",
@@ -20,6 +30,10 @@ __all__ = [
     "register_agent",
     "heartbeat",
     "report_action",
+    "report_action_nowait",
+    "flush_audit",
+    "close_async_client",
+    "close_session",
     "EVENT_REGISTER_REQUEST",
     "EVENT_IDENTITY",
     "EVENT_ACTION",
@@ -7,6 +7,7 @@ into the Ziwei governance platform.
 
 from .base import AgentAdapter, Task, TaskResult, HealthStatus, AdapterConfig
 from .registry import AdapterRegistry
+from .batcher import ActionBatcher
 from .cli_base import CLIAdapterBase
 from .plugin_base import PluginAdapterBase
 from .sdk_base import SDKAdapterBase
@@ -18,6 +19,7 @@ __all__ = [
     "HealthStatus",
     "AdapterConfig",
     "AdapterRegistry",
+    "ActionBatcher",
     "CLIAdapterBase",
     "PluginAdapterBase",
     "SDKAdapterBase",
@@ -3,8 +3,8 @@ Base adapter interface and data models for all agent types.
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional, Union
 from enum import Enum
 
 
@@ -16,29 +16,34 @@ class HealthStatus(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """Task to be executed by an agent"""
     id: str
     description: str
     owner_id: str
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None
     timeout: Optional[int] = None  # seconds
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskResult:
     """Result of task execution"""
     task_id: str
     status: str  # "success", "failed", "timeout"
-    output: str = ""
+    output: Union[str, bytes] = ""  # bytes for binary-producing agents
     error: Optional[str] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AdapterConfig:
-    """Configuration for an adapter"""
+    """
+    Configuration for an adapter.
+
+    Fields are frozen; use `dataclasses.replace` to derive a config with
+    different values. `extra` is a private copy of the dict passed in.
+    """
     adapter_type: str
     owner_id: str
     tianshu_api_base: str
@@ -46,13 +51,23 @@ class AdapterConfig:
     heartbeat_interval: int = 30
     task_timeout: int = 300
     auto_report_actions: bool = True
-    extra: Dict[str, Any] = field(default_factory=dict)
+    extra: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self) -> None:
+        if self.extra is not None:
+            object.__setattr__(self, "extra", dict(self.extra))
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value, checking extra dict first"""
-        if key in self.extra:
-            return self.extra[key]
-        return getattr(self, key, default)
+        extra = self.extra
+        if extra and key in extra:
+            return extra[key]
+        if key in _CONFIG_FIELDS:
+            return getattr(self, key)
+        return default
+
+
+_CONFIG_FIELDS = frozenset(f.name for f in fields(AdapterConfig))
 
 
 class AgentAdapter(ABC):
@@ -118,6 +133,15 @@ class AgentAdapter(ABC):
         """
         pass
 
+    async def warm_up(self) -> None:
+        """
+        Pre-open connections used on the hot path.
+
+        Called by AdapterManager after a successful initialize() so the first
+        heartbeat/report does not pay connection setup. Default is a no-op.
+        """
+        pass
+
     async def report_action(self, action_type: str, detail: Dict[str, Any]) -> None:
         """
         Report action to Diting for audit.
@@ -0,0 +1,79 @@
+"""
+Action batcher for Diting audit reports.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class ActionBatcher:
+    """
+    Buffers action reports and sends them to Diting in batches.
+
+    Pending events are flushed every `flush_interval` seconds, or as soon as
+    `max_batch` events are queued, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+        max_batch: int = 32,
+        flush_interval: float = 0.5,
+    ):
+        """
+        Args:
+            send: Coroutine function that delivers one batch of events
+            max_batch: Flush as soon as this many events are pending
+            flush_interval: Maximum seconds an event waits before flushing
+        """
+        self._send = send
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._pending: List[Dict[str, Any]] = []
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the background flusher"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def put(self, event: Dict[str, Any]) -> None:
+        """Queue an event for the next batch"""
+        self._pending.append(event)
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+
+    async def flush(self) -> None:
+        """Send all pending events now"""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            await self._send(batch)
+        except Exception as e:
+            logger.warning("Failed to report %d actions: %s", len(batch), e)
+
+    async def stop(self) -> None:
+        """Stop the flusher and drain remaining events"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
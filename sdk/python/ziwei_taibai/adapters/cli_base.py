@@ -4,7 +4,7 @@ CLI Adapter Base for subprocess-based agents.
 
 import asyncio
 import subprocess
-from typing import List, Optional
+from typing import List, Optional, Union
 from .base import AgentAdapter, Task, TaskResult, HealthStatus, AdapterConfig
 
 
@@ -15,66 +15,88 @@ class CLIAdapterBase(AgentAdapter):
     Subclasses should implement:
     - _task_to_command: Convert task to CLI command
     - _parse_output: Parse CLI output to TaskResult
+
+    The CLI is expected to terminate each response with a line equal to
+    `response_sentinel`.
     """
 
+    # Marks the end of one response on the CLI's stdout
+    response_sentinel: bytes = b"<END>\n"
+    # Max bytes buffered while waiting for the sentinel
+    stream_limit: int = 16 * 1024 * 1024
+
     def __init__(self, config: AdapterConfig, cli_path: str, cli_args: Optional[List[str]] = None):
         super().__init__(config)
         self.cli_path = cli_path
         self.cli_args = cli_args or []
-        self.process: Optional[subprocess.Popen] = None
+        # Executable plus fixed arguments, built once and reused per command
+        self._cmd_prefix: tuple[str, ...] = (cli_path, *self.cli_args)
+        self.process: Optional[asyncio.subprocess.Process] = None
         self._heartbeat_task: Optional[asyncio.Task] = None
 
-    async def start_process(self) -> subprocess.Popen:
+    async def start_process(self) -> asyncio.subprocess.Process:
         """
         Start CLI process.
 
         Returns:
-            subprocess.Popen instance
+            asyncio.subprocess.Process instance
         """
-        cmd = [self.cli_path] + self.cli_args
-        self.process = subprocess.Popen(
-            cmd,
+        self.process = await asyncio.create_subprocess_exec(
+            *self._cmd_prefix,
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
+            limit=self.stream_limit,
         )
         return self.process
 
-    async def send_command(self, command: str) -> str:
+    async def send_command(self, command: str, timeout: Optional[float] = None) -> str:
         """
         Send command to CLI and get response.
 
         Args:
             command: Command to send
+            timeout: Seconds to wait for the response (default: config.task_timeout);
+                on timeout the process is killed, as its output can no longer
+                be framed reliably
 
         Returns:
             CLI output as string
         """
-        if not self.process or self.process.poll() is not None:
+        if not self.process or self.process.returncode is not None:
             raise RuntimeError("CLI process not running")
+        if timeout is None:
+            timeout = self.config.task_timeout
 
         # Write command
-        self.process.stdin.write(command + "\n")
-        self.process.stdin.flush()
+        self.process.stdin.write(command.encode() + b"\n")
+        await self.process.stdin.drain()
 
-        # Read output (simple implementation - may need buffering for complex CLIs)
-        output_lines = []
-        # TODO: Implement proper output reading with timeout
-        # For now, read until EOF or timeout
         try:
-            output = self.process.stdout.read()
-            return output
+            output = await asyncio.wait_for(self._read_response(self.process.stdout), timeout)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+            raise RuntimeError(f"Command timed out after {timeout} seconds") from None
         except Exception as e:
             raise RuntimeError(f"Failed to read CLI output: {e}")
+        return output.decode()
+
+    async def _read_response(self, stdout: asyncio.StreamReader) -> bytes:
+        """Read output up to a line equal to the response sentinel."""
+        sentinel = self.response_sentinel
+        output = await stdout.readuntil(sentinel)
+        # readuntil also matches the sentinel at the end of a longer line
+        while len(output) > len(sentinel) and output[-len(sentinel) - 1] != 0x0A:
+            output += await stdout.readuntil(sentinel)
+        return output[:-len(sentinel)]
 
     async def health_check(self) -> HealthStatus:
         """Check if CLI process is running"""
         if not self.process:
             return HealthStatus.UNHEALTHY
 
-        if self.process.poll() is None:
+        if self.process.returncode is None:
             return HealthStatus.HEALTHY
         else:
             return HealthStatus.UNHEALTHY
@@ -88,13 +110,13 @@ class CLIAdapterBase(AgentAdapter):
             except asyncio.CancelledError:
                 pass
 
-        if self.process and self.process.poll() is None:
+        if self.process and self.process.returncode is None:
             self.process.terminate()
             try:
-                self.process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+            except asyncio.TimeoutError:
                 self.process.kill()
-                self.process.wait()
+                await self.process.wait()
 
     def _task_to_command(self, task: Task) -> str:
         """
@@ -110,14 +132,14 @@ class CLIAdapterBase(AgentAdapter):
         """
         raise NotImplementedError("Subclasses must implement _task_to_command")
 
-    def _parse_output(self, output: str, task: Task) -> TaskResult:
+    def _parse_output(self, output: Union[str, bytes], task: Task) -> TaskResult:
         """
         Parse CLI output into TaskResult.
 
         Subclasses must implement this method.
 
         Args:
-            output: CLI output
+            output: CLI output (str, or raw bytes if not yet decoded)
             task: Original task
 
         Returns:
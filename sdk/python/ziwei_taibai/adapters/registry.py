@@ -2,7 +2,9 @@
 Adapter Registry and Factory.
 """
 
-from typing import Dict, Type
+import sys
+from types import MappingProxyType
+from typing import Dict, Mapping, Type
 from .base import AgentAdapter, AdapterConfig
 
 
@@ -14,6 +16,9 @@ class AdapterRegistry:
     """
 
     _adapters: Dict[str, Type[AgentAdapter]] = {}
+    # Read-only live view of _adapters, shared by all callers
+    _view: Mapping[str, Type[AgentAdapter]] = MappingProxyType(_adapters)
+    _UNKNOWN_ADAPTER = "Unknown adapter: {}. Available adapters: {}"
 
     @classmethod
     def register(cls, name: str, adapter_class: Type[AgentAdapter]) -> None:
@@ -24,7 +29,7 @@ class AdapterRegistry:
             name: Adapter name (e.g., "claude-code-cli")
             adapter_class: Adapter class
         """
-        cls._adapters[name] = adapter_class
+        cls._adapters[sys.intern(name)] = adapter_class
 
     @classmethod
     def create(cls, name: str, config: AdapterConfig) -> AgentAdapter:
@@ -41,22 +46,24 @@ class AdapterRegistry:
         Raises:
             ValueError: If adapter name is not registered
         """
-        if name not in cls._adapters:
+        try:
+            adapter_class = cls._adapters[name]
+        except KeyError:
             raise ValueError(
-                f"Unknown adapter: {name}. "
-                f"Available adapters: {', '.join(cls._adapters.keys())}"
-            )
-        return cls._adapters[name](config)
+                cls._UNKNOWN_ADAPTER.format(name, ", ".join(cls._adapters))
+            ) from None
+        return adapter_class(config)
 
     @classmethod
-    def list_adapters(cls) -> list[str]:
+    def list_adapters(cls) -> Mapping[str, Type[AgentAdapter]]:
         """
-        List all registered adapter names.
+        List all registered adapters.
 
         Returns:
-            List of adapter names
+            Read-only view mapping adapter names to classes; iterating it
+            yields the names. The view reflects later registrations.
         """
-        return list(cls._adapters.keys())
+        return cls._view
 
     @classmethod
     def is_registered(cls, name: str) -> bool:
@@ -1,37 +1,132 @@
 # 太白 Agent 封装：发现、注册、心跳、操作上报
 # 当前以 HTTP 调用天枢/谛听为主；与技术方案 §4 协议对齐
 
+import asyncio
+import importlib.util
+import logging
 import os
+import queue
+import threading
 import time
-import urllib.request
-import urllib.error
-import json
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import orjson
 
 from .protocol import ACTION_VERIFICATION_PING
 
+logger = logging.getLogger(__name__)
+
 
 def _get_env(key: str, default: Optional[str] = None) -> str:
     v = os.environ.get(key, default)
     return (v or "").strip()
 
 
+# 同步/异步调用各自共享一个 keep-alive 连接池，避免每次请求重新握手
+_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+# 安装了 h2（httpx[http2]）时启用 HTTP/2，心跳与审计上报可在同一连接上多路复用
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_sync_client: Optional[httpx.Client] = None
+_sync_client_lock = threading.Lock()
+# httpx.AsyncClient 的连接绑定在创建它的事件循环上，因此按事件循环区分
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _get_client() -> httpx.Client:
+    """获取（或懒创建）模块级共享的 httpx.Client（线程安全）。"""
+    global _sync_client
+    client = _sync_client
+    if client is None or client.is_closed:
+        with _sync_client_lock:
+            if _sync_client is None or _sync_client.is_closed:
+                _sync_client = httpx.Client(limits=_POOL_LIMITS, timeout=30.0, http2=_HTTP2)
+            client = _sync_client
+    return client
+
+
+def close_session() -> None:
+    """关闭共享的 httpx.Client；下次同步调用时会重新创建。"""
+    global _sync_client
+    with _sync_client_lock:
+        client, _sync_client = _sync_client, None
+    if client is not None:
+        client.close()
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """获取（或懒创建）当前事件循环上共享的 httpx.AsyncClient。"""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        # 旧循环上的客户端无法在新循环中关闭，直接丢弃
+        _async_client = httpx.AsyncClient(limits=_POOL_LIMITS, timeout=30.0, http2=_HTTP2)
+        _async_client_loop = loop
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """关闭共享的 httpx.AsyncClient；下次异步调用时会重新创建。"""
+    global _async_client, _async_client_loop
+    client, loop = _async_client, _async_client_loop
+    _async_client = _async_client_loop = None
+    if client is not None and loop is asyncio.get_running_loop():
+        await client.aclose()
+
+
+def _post_json(url: str, body: bytes, timeout: float, op_name: str) -> Dict[str, Any]:
+    # 同步 POST 的统一出口：非 2xx 统一转为 RuntimeError(f"{op_name}失败 ...")
+    r = _get_client().post(url, content=body, headers=_JSON_HEADERS, timeout=timeout)
+    if r.is_error:
+        raise RuntimeError(f"{op_name}失败 {r.status_code}: {r.text}")
+    return orjson.loads(r.content)
+
+
+async def _apost(
+    url: str,
+    body: bytes,
+    timeout: float,
+    op_name: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict[str, Any]:
+    r = await (client or _get_async_client()).post(url, content=body, headers=_JSON_HEADERS, timeout=timeout)
+    if r.is_error:
+        raise RuntimeError(f"{op_name}失败 {r.status_code}: {r.text}")
+    return orjson.loads(r.content)
+
+
+_DISCOVERY_PATHS = ("/.well-known/tianshu-matrix", "/api/v1/discovery")
+_REGISTER_PATH = "/api/v1/agents/register"
+_HEARTBEAT_PATH = "/api/v1/agents/heartbeat"
+
+
+def _discover(urls: Tuple[str, ...]) -> Dict[str, Any]:
+    for url in urls:
+        try:
+            r = _get_client().get(url, timeout=10)
+            r.raise_for_status()
+            return orjson.loads(r.content)
+        except Exception as e:
+            if url is urls[-1]:
+                raise RuntimeError(f"发现天枢失败: {url}") from e
+    raise RuntimeError("发现天枢失败: 未找到 discovery 端点")
+
+
+async def _aget_json(client: httpx.AsyncClient, url: str) -> Dict[str, Any]:
+    r = await client.get(url, timeout=10)
+    r.raise_for_status()
+    return orjson.loads(r.content)
+
+
 def discover_tianshu(api_base: Optional[str] = None) -> Dict[str, Any]:
     """发现天枢端点：GET api_base/.well-known/tianshu-matrix 或 /api/v1/discovery。"""
     base = (api_base or _get_env("TIANSHU_API_BASE", "")).rstrip("/")
     if not base:
         raise ValueError("TIANSHU_API_BASE 未设置")
-    for path in ("/.well-known/tianshu-matrix", "/api/v1/discovery"):
-        url = base + path
-        try:
-            req = urllib.request.Request(url, method="GET")
-            with urllib.request.urlopen(req, timeout=10) as r:
-                return json.loads(r.read().decode())
-        except Exception as e:
-            if path == "/api/v1/discovery":
-                raise RuntimeError(f"发现天枢失败: {url}") from e
-            continue
-    raise RuntimeError("发现天枢失败: 未找到 discovery 端点")
+    return _discover(tuple(base + path for path in _DISCOVERY_PATHS))
 
 
 def register_agent(
@@ -40,39 +135,29 @@ def register_agent(
     agent_display_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """向天枢注册 Agent（若天枢暴露 POST /api/v1/agents/register）。"""
-    url = api_base.rstrip("/") + "/api/v1/agents/register"
+    return _register(api_base.rstrip("/") + _REGISTER_PATH, owner_id, agent_display_id)
+
+
+def _register(url: str, owner_id: str, agent_display_id: Optional[str]) -> Dict[str, Any]:
     payload = {"owner_id": owner_id}
     if agent_display_id:
         payload["agent_display_id"] = agent_display_id
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode(),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=15) as r:
-            return json.loads(r.read().decode())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"注册失败 {e.code}: {body}") from e
+    return _post_json(url, orjson.dumps(payload), 15, "注册")
 
 
 def heartbeat(api_base: str, agent_id: str) -> Dict[str, Any]:
     """向天枢上报心跳（若天枢暴露 POST /api/v1/agents/heartbeat）。"""
-    url = api_base.rstrip("/") + "/api/v1/agents/heartbeat"
-    req = urllib.request.Request(
-        url,
-        data=json.dumps({"agent_id": agent_id, "status": "online"}).encode(),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=10) as r:
-            return json.loads(r.read().decode())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"心跳失败 {e.code}: {body}") from e
+    return _post_json(api_base.rstrip("/") + _HEARTBEAT_PATH, _heartbeat_payload(agent_id), 10, "心跳")
+
+
+# 心跳载荷只有 agent_id 会变：拼接常量前后缀，按 agent_id 缓存结果
+_HB_PREFIX = b'{"agent_id":'
+_HB_SUFFIX = b',"status":"online"}'
+
+
+@lru_cache(maxsize=64)
+def _heartbeat_payload(agent_id: str) -> bytes:
+    return _HB_PREFIX + orjson.dumps(agent_id) + _HB_SUFFIX
 
 
 def report_action(
@@ -85,24 +170,105 @@ def report_action(
     url = (diting_audit_url or _get_env("DITING_AUDIT_URL", "")).rstrip("/")
     if not url:
         raise ValueError("DITING_AUDIT_URL 未设置")
-    payload = {
+    return _report(url, agent_id, action_type, detail)
+
+
+def _action_payload(
+    agent_id: str,
+    action_type: str,
+    detail: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    return {
         "agent_id": agent_id,
         "action_type": action_type,
-        "timestamp": int(time.time()),
+        "timestamp": time.time_ns() // 1_000_000_000,
         "detail": detail or {},
     }
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode(),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+
+
+def _report(
+    url: str,
+    agent_id: str,
+    action_type: str,
+    detail: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    payload = _action_payload(agent_id, action_type, detail)
+    return _post_json(url, orjson.dumps(payload), 10, "审计上报")
+
+
+# 异步审计上报：事件入队，由后台线程按批 POST {"events": [...]} 至 <url>/bulk
+_AUDIT_QUEUE_SIZE = 10000
+_AUDIT_BATCH_SIZE = 100
+_AUDIT_FLUSH_INTERVAL = 0.5
+_audit_queue: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue(maxsize=_AUDIT_QUEUE_SIZE)
+_audit_thread: Optional[threading.Thread] = None
+_audit_thread_lock = threading.Lock()
+
+
+def _report_bulk(url: str, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return _post_json(url + "/bulk", orjson.dumps({"events": events}), 10, "审计批量上报")
+
+
+def _audit_flusher() -> None:
+    while True:
+        batch = [_audit_queue.get()]
+        # 凑满一批或等满一个缓冲间隔后再发送
+        deadline = time.monotonic() + _AUDIT_FLUSH_INTERVAL
+        while len(batch) < _AUDIT_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_audit_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        by_url: Dict[str, List[Dict[str, Any]]] = {}
+        for url, event in batch:
+            by_url.setdefault(url, []).append(event)
+        for url, events in by_url.items():
+            try:
+                _report_bulk(url, events)
+            except Exception as e:
+                logger.warning("审计批量上报失败（%d 条）: %s", len(events), e)
+        for _ in batch:
+            _audit_queue.task_done()
+
+
+def _ensure_audit_flusher() -> None:
+    global _audit_thread
+    if _audit_thread is None:
+        with _audit_thread_lock:
+            if _audit_thread is None:
+                t = threading.Thread(target=_audit_flusher, name="taibai-audit-flusher", daemon=True)
+                t.start()
+                _audit_thread = t
+
+
+def report_action_nowait(
+    diting_audit_url: str,
+    agent_id: str,
+    action_type: str,
+    detail: Optional[Dict[str, Any]] = None,
+) -> None:
+    """将一条操作放入后台队列批量上报至谛听；队列满时退化为同步上报。"""
+    url = (diting_audit_url or _get_env("DITING_AUDIT_URL", "")).rstrip("/")
+    if not url:
+        raise ValueError("DITING_AUDIT_URL 未设置")
+    _enqueue_action(url, _action_payload(agent_id, action_type, detail))
+
+
+def _enqueue_action(url: str, payload: Dict[str, Any]) -> None:
+    _ensure_audit_flusher()
     try:
-        with urllib.request.urlopen(req, timeout=10) as r:
-            return json.loads(r.read().decode())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"审计上报失败 {e.code}: {body}") from e
+        _audit_queue.put_nowait((url, payload))
+    except queue.Full:
+        # 背压：队列满时由调用方同步发送，不丢事件
+        _report_bulk(url, [payload])
+
+
+def flush_audit() -> None:
+    """阻塞直到已入队的审计事件全部发送完毕（用于退出前）。"""
+    _audit_queue.join()
 
 
 class Agent:
@@ -114,19 +280,47 @@ class Agent:
         tianshu_api_base: Optional[str] = None,
         diting_audit_url: Optional[str] = None,
         agent_id: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
     ):
+        # http_client：可注入调用方自有的 httpx.AsyncClient 供 *_async 方法复用；
+        # 未注入时使用模块级共享连接池。注入的客户端由调用方负责关闭
         self.owner = owner
+        self._http_client = http_client
         self.tianshu_api_base = tianshu_api_base or _get_env("TIANSHU_API_BASE")
         self.diting_audit_url = diting_audit_url or _get_env("DITING_AUDIT_URL")
         self._agent_id = agent_id or _get_env("VERIFICATION_AGENT_ID")
 
+    @property
+    def tianshu_api_base(self) -> str:
+        return self._tianshu_api_base
+
+    @tianshu_api_base.setter
+    def tianshu_api_base(self, value: Optional[str]) -> None:
+        # 端点 URL 只随 api_base 变化，赋值时一次算好，调用时不再 rstrip/拼接
+        self._tianshu_api_base = value or ""
+        base = self._tianshu_api_base.rstrip("/")
+        self._discover_urls = tuple(base + path for path in _DISCOVERY_PATHS) if base else ()
+        self._register_url = base + _REGISTER_PATH
+        self._heartbeat_url = base + _HEARTBEAT_PATH
+
+    @property
+    def diting_audit_url(self) -> str:
+        return self._diting_audit_url
+
+    @diting_audit_url.setter
+    def diting_audit_url(self, value: Optional[str]) -> None:
+        self._diting_audit_url = value or ""
+        self._diting_url = (value or _get_env("DITING_AUDIT_URL", "")).rstrip("/")
+
     def discover(self) -> Dict[str, Any]:
-        return discover_tianshu(self.tianshu_api_base)
+        if not self._discover_urls:
+            return discover_tianshu()
+        return _discover(self._discover_urls)
 
     def register(self, agent_display_id: Optional[str] = None) -> Dict[str, Any]:
         if not self.tianshu_api_base:
             raise ValueError("tianshu_api_base 未设置")
-        out = register_agent(self.tianshu_api_base, self.owner, agent_display_id)
+        out = _register(self._register_url, self.owner, agent_display_id)
         if out.get("ok") and out.get("agent_id"):
             self._agent_id = out["agent_id"]
         return out
@@ -134,7 +328,7 @@ class Agent:
     def heartbeat(self) -> Dict[str, Any]:
         if not self._agent_id:
             raise ValueError("无 agent_id，请先 register 或设置 VERIFICATION_AGENT_ID")
-        return heartbeat(self.tianshu_api_base or "", self._agent_id)
+        return _post_json(self._heartbeat_url, self._heartbeat_body(), 10, "心跳")
 
     def trace(
         self,
@@ -143,13 +337,111 @@ class Agent:
     ) -> Dict[str, Any]:
         if not self._agent_id:
             raise ValueError("无 agent_id")
-        return report_action(
-            self.diting_audit_url or "",
+        return _report(
+            self._audit_url(),
             self._agent_id,
             action_type,
             detail if detail else None,
         )
 
+    def trace_nowait(self, action_type: str, **detail: Any) -> None:
+        """同 trace，但经后台队列批量上报，不等待谛听响应。"""
+        _enqueue_action(self._audit_url(), self.action_event(action_type, detail))
+
+    async def discover_async(self) -> Dict[str, Any]:
+        if not self._discover_urls:
+            raise ValueError("TIANSHU_API_BASE 未设置")
+        client = self._http_client or _get_async_client()
+        urls = self._discover_urls
+        # 并行探测各 discovery 端点，取第一个成功的响应，其余取消
+        probes = [asyncio.ensure_future(_aget_json(client, url)) for url in urls]
+        pending = set(probes)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # 同时完成时按端点顺序优先
+                for probe in probes:
+                    if probe in done:
+                        if probe.exception() is None:
+                            return probe.result()
+                        error = probe.exception()
+        finally:
+            for probe in pending:
+                probe.cancel()
+        raise RuntimeError(f"发现天枢失败: {urls[-1]}") from error
+
+    async def warm_up(self) -> None:
+        """预先建立到天枢/谛听的 keep-alive 连接，首个心跳/上报无需再握手；失败忽略。"""
+        client = self._http_client or _get_async_client()
+        urls = [u for u in (self._tianshu_api_base.rstrip("/"), self._diting_url) if u]
+        results = await asyncio.gather(
+            *(client.head(url, timeout=5) for url in urls),
+            return_exceptions=True,
+        )
+        for url, r in zip(urls, results):
+            if isinstance(r, Exception):
+                logger.debug("连接预热失败 %s: %s", url, r)
+
+    async def register_async(self, agent_display_id: Optional[str] = None) -> Dict[str, Any]:
+        if not self.tianshu_api_base:
+            raise ValueError("tianshu_api_base 未设置")
+        payload = {"owner_id": self.owner}
+        if agent_display_id:
+            payload["agent_display_id"] = agent_display_id
+        out = await _apost(
+            self._register_url,
+            orjson.dumps(payload),
+            15,
+            "注册",
+            self._http_client,
+        )
+        if out.get("ok") and out.get("agent_id"):
+            self._agent_id = out["agent_id"]
+        return out
+
+    async def heartbeat_async(self) -> Dict[str, Any]:
+        if not self._agent_id:
+            raise ValueError("无 agent_id，请先 register 或设置 VERIFICATION_AGENT_ID")
+        return await _apost(
+            self._heartbeat_url,
+            self._heartbeat_body(),
+            10,
+            "心跳",
+            self._http_client,
+        )
+
+    async def trace_async(
+        self,
+        action_type: str,
+        **detail: Any,
+    ) -> Dict[str, Any]:
+        return await self.trace_raw(orjson.dumps(self.action_event(action_type, detail)))
+
+    async def trace_batch_async(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """批量上报操作：POST {"events": [...]} 至谛听 <DITING_AUDIT_URL>/bulk。"""
+        return await self.trace_raw(orjson.dumps({"events": events}), bulk=True)
+
+    async def trace_raw(self, payload: bytes, bulk: bool = False) -> Dict[str, Any]:
+        """直接上报已序列化的 JSON 载荷（见 action_event），不再重建或重新序列化。"""
+        if bulk:
+            return await _apost(self._audit_url() + "/bulk", payload, 10, "审计批量上报", self._http_client)
+        return await _apost(self._audit_url(), payload, 10, "审计上报", self._http_client)
+
+    def action_event(self, action_type: str, detail: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """构造一条操作审计事件（与 report_action 载荷一致）。"""
+        if not self._agent_id:
+            raise ValueError("无 agent_id")
+        return _action_payload(self._agent_id, action_type, detail)
+
+    def _heartbeat_body(self) -> bytes:
+        return _heartbeat_payload(self._agent_id)
+
+    def _audit_url(self) -> str:
+        if not self._diting_url:
+            raise ValueError("DITING_AUDIT_URL 未设置")
+        return self._diting_url
+
     @property
     def agent_id(self) -> Optional[str]:
         return self._agent_id
@@ -2,11 +2,40 @@
 Configuration loading and validation for adapters.
 """
 
+import dataclasses
 import os
 import yaml
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from .adapters.base import AdapterConfig
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+# Fields mapped onto AdapterConfig attributes; everything else goes into extra
+_KNOWN_FIELDS = frozenset({
+    "type",
+    "owner_id",
+    "tianshu_api_base",
+    "diting_audit_url",
+    "heartbeat_interval",
+    "task_timeout",
+    "auto_report_actions",
+})
+
+# ADAPTER_* variables consumed directly by load_config_from_env
+_EXCLUDED_ENV = frozenset({
+    "ADAPTER_TYPE",
+    "ADAPTER_OWNER_ID",
+    "ADAPTER_HEARTBEAT_INTERVAL",
+    "ADAPTER_TASK_TIMEOUT",
+    "ADAPTER_AUTO_REPORT_ACTIONS",
+})
+
+# abspath -> (st_mtime_ns, parsed config); reloads skip parsing unchanged files
+_CONFIG_CACHE: Dict[str, Tuple[int, AdapterConfig]] = {}
+
 
 def load_config_from_file(config_path: str) -> AdapterConfig:
     """
@@ -22,17 +51,26 @@ def load_config_from_file(config_path: str) -> AdapterConfig:
         FileNotFoundError: If config file doesn't exist
         ValueError: If config is invalid
     """
-    if not os.path.exists(config_path):
-        raise FileNotFoundError(f"Config file not found: {config_path}")
-
-    with open(config_path, "r") as f:
-        data = yaml.safe_load(f)
-
-    if not data or "adapter" not in data:
-        raise ValueError("Invalid config: missing 'adapter' section")
-
-    adapter_config = data["adapter"]
-    return _dict_to_config(adapter_config)
+    key = os.path.abspath(config_path)
+    try:
+        f = open(key, "rb")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Config file not found: {config_path}") from None
+
+    with f:
+        mtime = os.fstat(f.fileno()).st_mtime_ns
+        cached = _CONFIG_CACHE.get(key)
+        if cached is not None and cached[0] == mtime:
+            config = cached[1]
+        else:
+            data = yaml.load(f, Loader=_YamlLoader)
+            if not data or "adapter" not in data:
+                raise ValueError("Invalid config: missing 'adapter' section")
+            config = _dict_to_config(data["adapter"])
+            _CONFIG_CACHE[key] = (mtime, config)
+
+    # Hand out a copy so callers cannot mutate the cached instance's extra
+    return dataclasses.replace(config)
 
 
 def load_config_from_env() -> AdapterConfig:
@@ -67,19 +105,12 @@ def load_config_from_env() -> AdapterConfig:
     if not tianshu_api_base:
         raise ValueError("TIANSHU_API_BASE environment variable is required")
 
-    # Collect extra config from ADAPTER_* variables
-    extra = {}
-    for key, value in os.environ.items():
-        if key.startswith("ADAPTER_") and key not in [
-            "ADAPTER_TYPE",
-            "ADAPTER_OWNER_ID",
-            "ADAPTER_HEARTBEAT_INTERVAL",
-            "ADAPTER_TASK_TIMEOUT",
-            "ADAPTER_AUTO_REPORT_ACTIONS",
-        ]:
-            # Remove ADAPTER_ prefix and convert to lowercase
-            config_key = key[8:]  # Remove "ADAPTER_"
-            extra[config_key] = value
+    # Collect extra config from ADAPTER_* variables (prefix removed)
+    extra = {
+        key[8:]: value
+        for key, value in os.environ.items()
+        if key.startswith("ADAPTER_") and key not in _EXCLUDED_ENV
+    }
 
     return AdapterConfig(
         adapter_type=adapter_type,
@@ -117,19 +148,8 @@ def _dict_to_config(data: Dict[str, Any]) -> AdapterConfig:
     if not tianshu_api_base:
         raise ValueError("Missing required field: tianshu_api_base")
 
-    # Extract known fields
-    known_fields = {
-        "type",
-        "owner_id",
-        "tianshu_api_base",
-        "diting_audit_url",
-        "heartbeat_interval",
-        "task_timeout",
-        "auto_report_actions",
-    }
-
-    # Everything else goes into extra
-    extra = {k: v for k, v in data.items() if k not in known_fields}
+    # Everything other than the known fields goes into extra
+    extra = {k: v for k, v in data.items() if k not in _KNOWN_FIELDS}
 
     return AdapterConfig(
         adapter_type=adapter_type,
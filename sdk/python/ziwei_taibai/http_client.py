@@ -5,11 +5,28 @@ JSON 序列化/反序列化，以及超时控制。
 """
 
 import asyncio
-import json
-from typing import Any, Dict, Optional
-from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, Mapping, Optional
+from dataclasses import dataclass, field
 
 import aiohttp
+import orjson
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+class HTTPClientError(Exception):
+    """HTTP 请求返回非 2xx 状态"""
+    
+    def __init__(self, status: int, data: Any, message: str = "HTTP request failed"):
+        super().__init__(status, data, message)
+        self.status = status
+        self.data = data
+        self.message = message
+    
+    def __str__(self) -> str:
+        # 仅在真正需要展示时才格式化响应数据
+        return f"{self.message}: {self.data}"
 
 
 @dataclass
@@ -17,7 +34,13 @@ class HTTPResponse:
     """HTTP 响应封装"""
     status: int
     data: Any
-    headers: Dict[str, str]
+    # aiohttp 的只读（大小写不敏感）响应头视图，不做复制
+    raw_headers: Optional[Mapping[str, str]] = field(default=None, repr=False)
+    
+    @cached_property
+    def headers(self) -> Dict[str, str]:
+        """响应头字典（首次访问时才从 raw_headers 复制）"""
+        return dict(self.raw_headers) if self.raw_headers is not None else {}
     
     @property
     def ok(self) -> bool:
@@ -42,23 +65,36 @@ class HTTPClient:
             headers: 默认请求头
         """
         self.base_url = base_url.rstrip('/')
+        self._base_with_slash = self.base_url + '/'
         self.timeout = aiohttp.ClientTimeout(total=timeout)
         self.default_headers = headers or {}
         self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """获取或创建会话"""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(
-                timeout=self.timeout,
-                headers=self.default_headers
-            )
-        return self._session
+        """获取或创建会话（并发首次调用只会创建一个会话）"""
+        session = self._session
+        if session is not None and not session.closed:
+            return session
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                # 显式连接池：保持 keep-alive 复用并缓存 DNS 解析结果
+                connector = aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=20,
+                    ttl_dns_cache=300,
+                    enable_cleanup_closed=True,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=self.timeout,
+                    headers=self.default_headers
+                )
+            return self._session
     
-    async def _build_url(self, path: str) -> str:
+    def _build_url(self, path: str) -> str:
         """构建完整 URL"""
-        path = path.lstrip('/')
-        return f"{self.base_url}/{path}"
+        return self._base_with_slash + path.lstrip('/')
     
     async def request(
         self,
@@ -83,38 +119,73 @@ class HTTPClient:
         Returns:
             HTTPResponse 对象
         """
-        session = await self._get_session()
-        url = await self._build_url(path)
-        
-        request_headers = {**self.default_headers}
-        if headers:
-            request_headers.update(headers)
-        
-        request_kwargs: Dict[str, Any] = {
-            'method': method,
-            'url': url,
-            'headers': request_headers,
-        }
+        return await self._send(method, path, data, params, headers, timeout, decode_ok=True)
+    
+    async def request_status(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> HTTPResponse:
+        """
+        发送只关心状态码的 HTTP 请求
         
-        if params:
-            request_kwargs['params'] = params
+        成功（2xx）时不解码响应体，data 恒为 None；失败时照常解析响应体，
+        便于构造 HTTPClientError。参数同 request。
+        """
+        return await self._send(method, path, data, params, headers, timeout, decode_ok=False)
+    
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Dict[str, Any]],
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]],
+        timeout: Optional[float],
+        decode_ok: bool
+    ) -> HTTPResponse:
+        session = await self._get_session()
+        url = self._build_url(path)
         
+        # 默认请求头已设置在会话上，这里只传本次请求额外的头
+        body = None
         if data is not None:
-            request_kwargs['json'] = data
+            # orjson 直接产出 bytes，绕过 aiohttp json= 的 stdlib 编码
+            body = orjson.dumps(data)
+            request_headers = _JSON_HEADERS if headers is None else {**_JSON_HEADERS, **headers}
+        else:
+            request_headers = headers
         
-        if timeout is not None:
-            request_kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+        request_timeout = self.timeout if timeout is None else aiohttp.ClientTimeout(total=timeout)
         
-        async with session.request(**request_kwargs) as response:
-            try:
-                response_data = await response.json()
-            except (aiohttp.ContentTypeError, json.JSONDecodeError):
-                response_data = await response.text()
+        async with session.request(
+            method,
+            url,
+            params=params or None,
+            data=body,
+            headers=request_headers,
+            timeout=request_timeout,
+        ) as response:
+            # 响应体仍需读完，连接才能回到 keep-alive 连接池
+            raw = await response.read()
+            if not decode_ok and 200 <= response.status < 300:
+                response_data = None
+            elif not raw.strip():
+                response_data = None
+            else:
+                try:
+                    response_data = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    response_data = await response.text()
             
             return HTTPResponse(
                 status=response.status,
                 data=response_data,
-                headers=dict(response.headers)
+                raw_headers=response.headers
             )
     
     async def get(
@@ -157,6 +228,26 @@ class HTTPClient:
         """发送 DELETE 请求"""
         return await self.request('DELETE', path, data=data, headers=headers, timeout=timeout)
     
+    async def post_status(
+        self,
+        path: str,
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> HTTPResponse:
+        """发送 POST 请求（成功时不解码响应体）"""
+        return await self.request_status('POST', path, data=data, headers=headers, timeout=timeout)
+    
+    async def delete_status(
+        self,
+        path: str,
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> HTTPResponse:
+        """发送 DELETE 请求（成功时不解码响应体）"""
+        return await self.request_status('DELETE', path, data=data, headers=headers, timeout=timeout)
+    
     async def close(self):
         """关闭会话"""
         if self._session and not self._session.closed:
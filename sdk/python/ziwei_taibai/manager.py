@@ -5,8 +5,22 @@ Manages adapter lifecycle: initialization, health monitoring, shutdown.
 """
 
 import asyncio
-from typing import Optional
+import logging
+from typing import Iterable, List, Optional
 from .adapters.base import AgentAdapter, HealthStatus
+from .agent import close_async_client, close_session
+
+logger = logging.getLogger(__name__)
+
+# Restart backoff after consecutive unhealthy checks: 1s, 2s, 4s, ... capped
+_RESTART_BACKOFF_INITIAL = 1.0
+_RESTART_BACKOFF_MAX = 60.0
+
+
+async def _close_shared_clients() -> None:
+    """Release the SDK's process-wide pooled HTTP clients"""
+    close_session()
+    await close_async_client()
 
 
 class AdapterManager:
@@ -20,31 +34,51 @@ class AdapterManager:
     - Graceful shutdown
     """
 
-    def __init__(self, adapter: AgentAdapter, auto_restart: bool = True):
+    def __init__(
+        self,
+        adapter: AgentAdapter,
+        auto_restart: bool = True,
+        health_monitor: bool = True,
+        owns_clients: bool = False,
+    ):
         self.adapter = adapter
         self.auto_restart = auto_restart
+        self.health_monitor = health_monitor
+        # Whether stop() closes the SDK's process-wide HTTP clients. Only the
+        # process owner (e.g. the taibai-adapter entrypoint) should set this:
+        # closing them breaks in-flight calls from other Agent users
+        self.owns_clients = owns_clients
         self._running = False
         self._health_check_task: Optional[asyncio.Task] = None
+        self._restart_task: Optional[asyncio.Task] = None
+        self._restart_backoff = _RESTART_BACKOFF_INITIAL
 
     async def start(self) -> None:
         """Start adapter and health monitoring"""
-        print(f"[AdapterManager] Starting adapter: {self.adapter.__class__.__name__}")
+        logger.info("Starting adapter: %s", self.adapter.__class__.__name__)
 
         # Initialize adapter
         success = await self.adapter.initialize()
         if not success:
             raise RuntimeError("Adapter initialization failed")
 
+        # Prime keep-alive connections before the first heartbeat
+        try:
+            await self.adapter.warm_up()
+        except Exception as e:
+            logger.warning("Connection warm-up failed: %s", e)
+
         self._running = True
 
-        # Start health monitoring
-        self._health_check_task = asyncio.create_task(self._health_monitor())
+        # Start health monitoring (AdapterFleetManager drives checks itself)
+        if self.health_monitor:
+            self._health_check_task = asyncio.create_task(self._health_monitor())
 
-        print(f"[AdapterManager] Adapter started successfully")
+        logger.info("Adapter started successfully")
 
     async def stop(self) -> None:
         """Stop adapter and health monitoring"""
-        print(f"[AdapterManager] Stopping adapter")
+        logger.info("Stopping adapter")
 
         self._running = False
 
@@ -56,44 +90,204 @@ class AdapterManager:
             except asyncio.CancelledError:
                 pass
 
+        # Abandon any pending restart
+        if self._restart_task:
+            self._restart_task.cancel()
+            try:
+                await self._restart_task
+            except asyncio.CancelledError:
+                pass
+            self._restart_task = None
+
         # Shutdown adapter
         await self.adapter.shutdown()
 
-        print(f"[AdapterManager] Adapter stopped")
+        # Release pooled HTTP connections
+        if self.owns_clients:
+            await _close_shared_clients()
+
+        logger.info("Adapter stopped")
 
     async def _health_monitor(self) -> None:
         """Monitor adapter health and restart if needed"""
+        loop = asyncio.get_running_loop()
+        interval = self.adapter.config.heartbeat_interval
+        # Schedule against a fixed timeline so slow checks don't drift the cadence
+        deadline = loop.time()
         while self._running:
             try:
-                await asyncio.sleep(30)  # Check every 30 seconds
+                deadline += interval
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
 
-                health = await self.adapter.health_check()
-                print(f"[AdapterManager] Health check: {health.value}")
+                await self.check_health()
 
-                if health == HealthStatus.UNHEALTHY and self.auto_restart:
-                    print(f"[AdapterManager] Adapter unhealthy, restarting...")
-                    await self._restart()
+                # Skip ticks missed while checking/restarting instead of bursting
+                now = loop.time()
+                if deadline < now:
+                    deadline = now
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"[AdapterManager] Health check failed: {e}")
+                logger.warning("Health check failed: %s", e)
+
+    async def check_health(self, timeout: Optional[float] = None) -> HealthStatus:
+        """
+        Run one health check, restarting the adapter if it is unhealthy.
 
-    async def _restart(self) -> None:
+        The restart runs as a background task so this call stays bounded by
+        timeout; while it is in progress the adapter is not checked again.
+
+        Args:
+            timeout: Seconds to wait for the adapter's health_check; a check
+                that times out is reported as DEGRADED and does not restart
+
+        Returns:
+            Observed health status (UNHEALTHY while a restart is in progress)
+        """
+        if self.restarting:
+            logger.debug("Restart in progress, skipping health check")
+            return HealthStatus.UNHEALTHY
+
+        try:
+            health = await asyncio.wait_for(self.adapter.health_check(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Health check for %s timed out after %ss",
+                self.adapter.__class__.__name__,
+                timeout,
+            )
+            return HealthStatus.DEGRADED
+        logger.debug("Health check: %s", health.value)
+
+        if health == HealthStatus.UNHEALTHY and self.auto_restart:
+            logger.warning("Adapter unhealthy, restarting in %.1fs", self._restart_backoff)
+            self._restart_task = asyncio.create_task(self._restart(self._restart_backoff))
+            self._restart_backoff = min(self._restart_backoff * 2, _RESTART_BACKOFF_MAX)
+        elif health != HealthStatus.UNHEALTHY:
+            self._restart_backoff = _RESTART_BACKOFF_INITIAL
+        return health
+
+    @property
+    def restarting(self) -> bool:
+        """Whether a restart is currently in progress"""
+        return self._restart_task is not None and not self._restart_task.done()
+
+    async def _restart(self, backoff: float) -> None:
         """Restart adapter"""
         try:
             # Shutdown
             await self.adapter.shutdown()
 
-            # Wait a bit
-            await asyncio.sleep(5)
+            # Back off before reinitializing
+            await asyncio.sleep(backoff)
 
             # Reinitialize
             success = await self.adapter.initialize()
             if not success:
-                print(f"[AdapterManager] Restart failed")
+                logger.error("Restart failed")
             else:
-                print(f"[AdapterManager] Restart successful")
+                logger.info("Restart successful")
 
         except Exception as e:
-            print(f"[AdapterManager] Restart failed: {e}")
+            logger.error("Restart failed: %s", e)
+
+
+class AdapterFleetManager:
+    """
+    Manages several adapters running in one process.
+
+    Health checks for all adapters fire concurrently on a single timer, each
+    bounded by check_timeout so one slow adapter doesn't delay the others.
+    Restarts run in the background and never hold up the shared tick.
+    Adapters share the SDK's pooled HTTP clients for Tianshu/Diting calls;
+    with owns_clients=True they are closed once after every adapter stops.
+    """
+
+    def __init__(
+        self,
+        adapters: Iterable[AgentAdapter],
+        auto_restart: bool = True,
+        interval: Optional[float] = None,
+        check_timeout: float = 5.0,
+        owns_clients: bool = False,
+    ):
+        self.managers: List[AdapterManager] = [
+            AdapterManager(
+                adapter, auto_restart=auto_restart, health_monitor=False, owns_clients=False
+            )
+            for adapter in adapters
+        ]
+        if not self.managers:
+            raise ValueError("AdapterFleetManager requires at least one adapter")
+        # Default to the shortest configured heartbeat interval
+        self.interval = interval or min(m.adapter.config.heartbeat_interval for m in self.managers)
+        self.check_timeout = check_timeout
+        self.owns_clients = owns_clients
+        self._running = False
+        self._health_check_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start all adapters and the shared health monitor"""
+        results = await asyncio.gather(
+            *(m.start() for m in self.managers), return_exceptions=True
+        )
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if failures:
+            # Roll back the adapters that did start
+            await asyncio.gather(
+                *(m.stop() for m, r in zip(self.managers, results) if r is None),
+                return_exceptions=True,
+            )
+            raise RuntimeError(
+                f"{len(failures)} of {len(self.managers)} adapters failed to start"
+            ) from failures[0]
+
+        self._running = True
+        self._health_check_task = asyncio.create_task(self._health_monitor())
+        logger.info("Adapter fleet started (%d adapters)", len(self.managers))
+
+    async def stop(self) -> None:
+        """Stop the health monitor and all adapters"""
+        self._running = False
+
+        if self._health_check_task:
+            self._health_check_task.cancel()
+            try:
+                await self._health_check_task
+            except asyncio.CancelledError:
+                pass
+
+        await asyncio.gather(*(m.stop() for m in self.managers), return_exceptions=True)
+        # Adapters share the pooled clients; close them only once all are down
+        if self.owns_clients:
+            await _close_shared_clients()
+        logger.info("Adapter fleet stopped")
+
+    async def _health_monitor(self) -> None:
+        """Check every adapter concurrently once per interval"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while self._running:
+            try:
+                deadline += self.interval
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+
+                results = await asyncio.gather(
+                    *(m.check_health(self.check_timeout) for m in self.managers),
+                    return_exceptions=True,
+                )
+                for m, result in zip(self.managers, results):
+                    if isinstance(result, Exception):
+                        logger.warning(
+                            "Health check failed for %s: %s",
+                            m.adapter.__class__.__name__,
+                            result,
+                        )
+
+                now = loop.time()
+                if deadline < now:
+                    deadline = now
+
+            except asyncio.CancelledError:
+                break
@@ -3,13 +3,18 @@
 提供消息发送和订阅功能。
 """
 
-from typing import Any, Callable, Dict, Optional
+import asyncio
+import inspect
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
 from dataclasses import dataclass
 
-from .http_client import HTTPClient, HTTPResponse
+from .http_client import HTTPClient, HTTPClientError
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(slots=True)
 class Message:
     """消息对象"""
     id: str
@@ -19,6 +24,20 @@ class Message:
     type: str = "text"
     timestamp: Optional[float] = None
     metadata: Optional[Dict[str, Any]] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], default_type: str = "text") -> "Message":
+        """从 API 返回的字典构造消息（缺失字段取默认值）"""
+        get = data.get
+        return cls(
+            get("id", ""),
+            get("sender", ""),
+            get("recipient", ""),
+            get("content", ""),
+            get("type", default_type),
+            get("timestamp"),
+            get("metadata"),
+        )
 
 
 class MessageAPI:
@@ -64,18 +83,9 @@ class MessageAPI:
         response = await self._http.post("/api/messages", data=data)
         
         if not response.ok:
-            raise Exception(f"Failed to send message: {response.data}")
-        
-        msg_data = response.data
-        return Message(
-            id=msg_data.get("id", ""),
-            sender=msg_data.get("sender", ""),
-            recipient=msg_data.get("recipient", ""),
-            content=msg_data.get("content", ""),
-            type=msg_data.get("type", msg_type),
-            timestamp=msg_data.get("timestamp"),
-            metadata=msg_data.get("metadata")
-        )
+            raise HTTPClientError(response.status, response.data, "Failed to send message")
+        
+        return Message.from_dict(response.data, msg_type)
     
     async def get_message(self, message_id: str) -> Message:
         """
@@ -90,18 +100,9 @@ class MessageAPI:
         response = await self._http.get(f"/api/messages/{message_id}")
         
         if not response.ok:
-            raise Exception(f"Failed to get message: {response.data}")
-        
-        msg_data = response.data
-        return Message(
-            id=msg_data.get("id", ""),
-            sender=msg_data.get("sender", ""),
-            recipient=msg_data.get("recipient", ""),
-            content=msg_data.get("content", ""),
-            type=msg_data.get("type", "text"),
-            timestamp=msg_data.get("timestamp"),
-            metadata=msg_data.get("metadata")
-        )
+            raise HTTPClientError(response.status, response.data, "Failed to get message")
+        
+        return Message.from_dict(response.data)
     
     async def list_messages(
         self,
@@ -131,21 +132,49 @@ class MessageAPI:
         response = await self._http.get("/api/messages", params=params)
         
         if not response.ok:
-            raise Exception(f"Failed to list messages: {response.data}")
-        
-        messages = []
-        for msg_data in response.data.get("messages", []):
-            messages.append(Message(
-                id=msg_data.get("id", ""),
-                sender=msg_data.get("sender", ""),
-                recipient=msg_data.get("recipient", ""),
-                content=msg_data.get("content", ""),
-                type=msg_data.get("type", "text"),
-                timestamp=msg_data.get("timestamp"),
-                metadata=msg_data.get("metadata")
-            ))
-        
-        return messages
+            raise HTTPClientError(response.status, response.data, "Failed to list messages")
+        
+        # 响应体已由 HTTPClient 一次性 orjson 解析，这里单遍构造对象
+        return list(map(Message.from_dict, response.data.get("messages", ())))
+    
+    async def iter_messages(
+        self,
+        user_id: Optional[str] = None,
+        page_size: int = 500
+    ) -> AsyncIterator[Message]:
+        """
+        遍历全部消息（自动翻页）
+        
+        处理当前页时已在后台预取下一页，网络等待与消息处理相互重叠。
+        服务端可能把 limit 限制得比 page_size 小，因此按实际返回条数推进
+        偏移量，并以空页作为结束标志。
+        
+        Args:
+            user_id: 用户 ID（可选，用于筛选）
+            page_size: 每页请求数量
+            
+        Yields:
+            Message 对象
+        """
+        offset = 0
+        pending: Optional[asyncio.Future] = asyncio.ensure_future(
+            self.list_messages(user_id, limit=page_size, offset=offset)
+        )
+        try:
+            while pending is not None:
+                page = await pending
+                pending = None
+                if not page:
+                    break
+                offset += len(page)
+                pending = asyncio.ensure_future(
+                    self.list_messages(user_id, limit=page_size, offset=offset)
+                )
+                for msg in page:
+                    yield msg
+        finally:
+            if pending is not None:
+                pending.cancel()
     
     async def delete_message(self, message_id: str) -> bool:
         """
@@ -160,7 +189,7 @@ class MessageAPI:
         response = await self._http.delete(f"/api/messages/{message_id}")
         
         if not response.ok:
-            raise Exception(f"Failed to delete message: {response.data}")
+            raise HTTPClientError(response.status, response.data, "Failed to delete message")
         
         return True
 
@@ -176,7 +205,10 @@ class SubscriptionManager:
             ws_client: WebSocket 客户端实例
         """
         self._ws = ws_client
-        self._subscriptions: Dict[str, Callable[[Any], Any]] = {}
+        # 同步与异步回调分开存放，分发时无需逐个判断回调类型
+        self._subscriptions: Dict[str, List[Callable[[Any], Any]]] = {}
+        self._async_subscriptions: Dict[str, List[Callable[[Any], Awaitable[Any]]]] = {}
+        self._pending: Set[asyncio.Task] = set()
     
     async def subscribe(
         self,
@@ -184,29 +216,53 @@ class SubscriptionManager:
         callback: Callable[[Any], Any]
     ):
         """
-        订阅消息
+        订阅消息（同一事件类型可注册多个回调）
         
         Args:
             event_type: 事件类型
-            callback: 回调函数
+            callback: 回调函数，可以是普通函数或 async 函数
         """
-        self._subscriptions[event_type] = callback
+        is_new = (
+            event_type not in self._subscriptions
+            and event_type not in self._async_subscriptions
+        )
+        if inspect.iscoroutinefunction(callback):
+            subs = self._async_subscriptions
+        else:
+            subs = self._subscriptions
+        # 复制后替换，分发过程中增删回调不影响正在遍历的列表
+        subs[event_type] = [*subs.get(event_type, ()), callback]
         
-        # 发送订阅请求
-        await self._ws.send({
-            "type": "subscribe",
-            "event_type": event_type
-        })
+        # 首个订阅者才发送订阅请求
+        if is_new:
+            await self._ws.send({
+                "type": "subscribe",
+                "event_type": event_type
+            })
     
-    async def unsubscribe(self, event_type: str):
+    async def unsubscribe(
+        self,
+        event_type: str,
+        callback: Optional[Callable[[Any], Any]] = None
+    ):
         """
         取消订阅
         
         Args:
             event_type: 事件类型
+            callback: 要移除的回调；为 None 时移除该事件的全部回调
         """
-        if event_type in self._subscriptions:
-            del self._subscriptions[event_type]
+        for subs in (self._subscriptions, self._async_subscriptions):
+            if event_type not in subs:
+                continue
+            remaining = [] if callback is None else [cb for cb in subs[event_type] if cb != callback]
+            if remaining:
+                subs[event_type] = remaining
+            else:
+                del subs[event_type]
+        
+        if event_type in self._subscriptions or event_type in self._async_subscriptions:
+            return
         
         # 发送取消订阅请求
         await self._ws.send({
@@ -216,16 +272,36 @@ class SubscriptionManager:
     
     def handle_message(self, msg):
         """处理接收到的消息"""
-        event_type = msg.data.get("type", "")
-        
-        if event_type in self._subscriptions:
-            callback = self._subscriptions[event_type]
-            try:
-                callback(msg.data)
-            except Exception as e:
-                print(f"Subscription callback error: {e}")
+        data = msg.data
+        event_type = data.get("type", "")
+        
+        try:
+            callbacks = self._subscriptions[event_type]
+        except KeyError:
+            pass
+        else:
+            for callback in callbacks:
+                try:
+                    callback(data)
+                except Exception as e:
+                    logger.error("Subscription callback error: %s", e)
+        
+        try:
+            async_callbacks = self._async_subscriptions[event_type]
+        except KeyError:
+            return
+        for callback in async_callbacks:
+            task = asyncio.create_task(callback(data))
+            self._pending.add(task)
+            task.add_done_callback(self._on_callback_done)
+    
+    def _on_callback_done(self, task: asyncio.Task):
+        """异步回调结束：释放引用并报告异常"""
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Subscription callback error: %s", task.exception())
     
     @property
     def subscribed_events(self) -> list[str]:
         """获取已订阅的事件类型列表"""
-        return list(self._subscriptions.keys())
+        return list(self._subscriptions.keys() | self._async_subscriptions.keys())
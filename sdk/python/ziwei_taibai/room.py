@@ -3,34 +3,210 @@
 提供房间创建、加入和管理功能。
 """
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
-from .http_client import HTTPClient
+from .http_client import HTTPClient, HTTPClientError
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Room:
-    """房间对象"""
+    """
+    房间对象
+    
+    字段不可重新赋值。get_room/list_rooms 可能返回缓存中被多个调用方共享的
+    实例，members/metadata 容器本身仍可变，请勿原地修改。
+    """
     id: str
     name: str
     owner: str
     members: List[str]
     created_at: Optional[float] = None
     metadata: Optional[Dict[str, Any]] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Room":
+        """从 API 返回的字典构造房间（缺失字段取默认值）"""
+        get = data.get
+        return cls(
+            get("id", ""),
+            get("name", ""),
+            get("owner", ""),
+            get("members") or [],
+            get("created_at"),
+            get("metadata"),
+        )
+
+
+# 单个缓存字典的条目上限，超出时整体清空
+_CACHE_MAX_ENTRIES = 1024
+# 批量获取：单次请求最多合并的房间数
+_BATCH_MAX_IDS = 64
+
+_ROOMS_PATH = "/api/rooms"
+
+# 失效记录中代表"全部房间"/"全部列表"的 key
+_ALL_ROOMS = object()
+_ALL_LISTS = object()
+
+
+class _BatchingGetter:
+    """把短时间窗口内的单个房间查询合并为一次批量请求"""
+    
+    def __init__(self, fetch_bulk: Callable[[List[str]], Awaitable[List[Room]]], window: float):
+        self._fetch_bulk = fetch_bulk
+        self._window = window
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # 持有批量请求任务的强引用，防止执行中被垃圾回收
+        self._tasks: set[asyncio.Task] = set()
+    
+    def get(self, room_id: str) -> "asyncio.Future[Room]":
+        fut = self._pending.get(room_id)
+        if fut is not None:
+            return fut
+        loop = asyncio.get_running_loop()
+        fut = self._pending[room_id] = loop.create_future()
+        if len(self._pending) >= _BATCH_MAX_IDS:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+        return fut
+    
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: Dict[str, asyncio.Future]):
+        try:
+            rooms = await self._fetch_bulk(list(batch))
+        except Exception as e:
+            for fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        
+        found = {room.id: room for room in rooms}
+        for room_id, fut in batch.items():
+            if fut.done():
+                continue
+            room = found.get(room_id)
+            if room is None:
+                fut.set_exception(HTTPClientError(404, None, f"Room {room_id} not found"))
+            else:
+                fut.set_result(room)
 
 
 class RoomAPI:
     """房间 API"""
     
-    def __init__(self, http_client: HTTPClient):
+    def __init__(self, http_client: HTTPClient, cache_ttl: float = 2.0, batch_window: float = 0.0):
         """
         初始化房间 API
         
         Args:
             http_client: HTTP 客户端实例
+            cache_ttl: get_room/list_rooms 结果的缓存时间（秒，0 表示不缓存）；
+                本实例发起的房间变更会使相关缓存立即失效
+            batch_window: get_room 合并窗口（秒，0 表示不合并）；窗口内的查询
+                合并为一次 GET /api/rooms?ids=...，需服务端支持多 ID 查询
         """
         self._http = http_client
+        self.cache_ttl = cache_ttl
+        # key -> (过期时刻 monotonic, 结果)
+        self._room_cache: Dict[str, Tuple[float, Room]] = {}
+        self._list_cache: Dict[tuple, Tuple[float, List[Room]]] = {}
+        # 失效代数：每次失效递增，并记录到被失效的 key 上；读请求开始时
+        # 记下当前代数，若返回前对应 key 已被失效则不写入缓存
+        self._generation = 0
+        self._invalidated: Dict[Any, int] = {}
+        # 进行中的读请求：相同 key 的并发调用共享同一次 HTTP 往返
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._batcher = _BatchingGetter(self.get_rooms_bulk, batch_window) if batch_window > 0 else None
+    
+    def _cache_get(self, cache: Dict, key: Any) -> Any:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() < entry[0]:
+            return entry[1]
+        del cache[key]
+        return None
+    
+    def _room_stale(self, room_id: str, generation: int) -> bool:
+        invalidated = self._invalidated
+        return (
+            invalidated.get(room_id, 0) > generation
+            or invalidated.get(_ALL_ROOMS, 0) > generation
+        )
+    
+    def _lists_stale(self, generation: int) -> bool:
+        return self._invalidated.get(_ALL_LISTS, 0) > generation
+    
+    def _mark_invalidated(self, key: Any):
+        if len(self._invalidated) >= _CACHE_MAX_ENTRIES:
+            # 记录过多时整体收敛为"全部失效"：最多让进行中的请求少写一次缓存
+            self._invalidated.clear()
+            self._invalidated[_ALL_ROOMS] = self._generation
+            self._invalidated[_ALL_LISTS] = self._generation
+        self._invalidated[key] = self._generation
+    
+    def _drop_inflight(self, kind: str):
+        for key in [key for key in self._inflight if key[0] == kind]:
+            del self._inflight[key]
+    
+    def _invalidate_lists(self):
+        self._list_cache.clear()
+        self._mark_invalidated(_ALL_LISTS)
+        self._drop_inflight("list")
+    
+    def _cache_put(self, cache: Dict, key: Any, value: Any):
+        if self.cache_ttl <= 0:
+            return
+        if len(cache) >= _CACHE_MAX_ENTRIES:
+            cache.clear()
+        cache[key] = (time.monotonic() + self.cache_ttl, value)
+    
+    async def _single_flight(self, key: tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            
+            def _done(t: asyncio.Task):
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+            
+            task.add_done_callback(_done)
+        # shield：某个调用方被取消不影响其他等待同一请求的调用方
+        return await asyncio.shield(task)
+    
+    def invalidate_cache(self, room_id: Optional[str] = None):
+        """
+        使缓存失效
+        
+        Args:
+            room_id: 房间 ID；为 None 时清空全部房间缓存。列表缓存总是清空
+        """
+        self._generation += 1
+        if room_id is None:
+            self._room_cache.clear()
+            self._mark_invalidated(_ALL_ROOMS)
+            self._drop_inflight("room")
+        else:
+            self._room_cache.pop(room_id, None)
+            self._mark_invalidated(room_id)
+            # 变更前发起的读请求不再供后续调用方合并，避免读到旧数据
+            self._inflight.pop(("room", room_id), None)
+        self._invalidate_lists()
     
     async def create_room(
         self,
@@ -59,20 +235,16 @@ class RoomAPI:
         if metadata:
             data["metadata"] = metadata
         
-        response = await self._http.post("/api/rooms", data=data)
+        response = await self._http.post(_ROOMS_PATH, data=data)
         
         if not response.ok:
-            raise Exception(f"Failed to create room: {response.data}")
-        
-        room_data = response.data
-        return Room(
-            id=room_data.get("id", ""),
-            name=room_data.get("name", ""),
-            owner=room_data.get("owner", ""),
-            members=room_data.get("members", []),
-            created_at=room_data.get("created_at"),
-            metadata=room_data.get("metadata")
-        )
+            raise HTTPClientError(response.status, response.data, "Failed to create room")
+        
+        # 新房间只影响列表结果
+        self._generation += 1
+        self._invalidate_lists()
+        
+        return Room.from_dict(response.data)
     
     async def get_room(self, room_id: str) -> Room:
         """
@@ -84,20 +256,52 @@ class RoomAPI:
         Returns:
             Room 对象
         """
-        response = await self._http.get(f"/api/rooms/{room_id}")
+        cached = self._cache_get(self._room_cache, room_id)
+        if cached is not None:
+            return cached
+        
+        if self._batcher is not None:
+            fetch = lambda: self._batcher.get(room_id)
+        else:
+            fetch = lambda: self._fetch_room(room_id)
+        return await self._single_flight(("room", room_id), fetch)
+    
+    async def _fetch_room(self, room_id: str) -> Room:
+        generation = self._generation
+        response = await self._http.get(f"{_ROOMS_PATH}/{room_id}")
         
         if not response.ok:
-            raise Exception(f"Failed to get room: {response.data}")
-        
-        room_data = response.data
-        return Room(
-            id=room_data.get("id", ""),
-            name=room_data.get("name", ""),
-            owner=room_data.get("owner", ""),
-            members=room_data.get("members", []),
-            created_at=room_data.get("created_at"),
-            metadata=room_data.get("metadata")
-        )
+            raise HTTPClientError(response.status, response.data, "Failed to get room")
+        
+        room = Room.from_dict(response.data)
+        if not self._room_stale(room_id, generation):
+            self._cache_put(self._room_cache, room_id, room)
+        return room
+    
+    async def get_rooms_bulk(self, ids: List[str]) -> List[Room]:
+        """
+        批量获取房间详情
+        
+        Args:
+            ids: 房间 ID 列表
+            
+        Returns:
+            Room 对象列表（不存在的房间不包含在内）
+        """
+        if not ids:
+            return []
+        
+        generation = self._generation
+        response = await self._http.get(_ROOMS_PATH, params={"ids": ",".join(ids)})
+        
+        if not response.ok:
+            raise HTTPClientError(response.status, response.data, "Failed to get rooms")
+        
+        rooms = list(map(Room.from_dict, response.data.get("rooms", ())))
+        for room in rooms:
+            if not self._room_stale(room.id, generation):
+                self._cache_put(self._room_cache, room.id, room)
+        return rooms
     
     async def list_rooms(
         self,
@@ -116,6 +320,17 @@ class RoomAPI:
         Returns:
             Room 对象列表
         """
+        key = (user_id, limit, offset)
+        cached = self._cache_get(self._list_cache, key)
+        if cached is not None:
+            return list(cached)
+        
+        rooms = await self._single_flight(("list",) + key, lambda: self._fetch_rooms(key))
+        return list(rooms)
+    
+    async def _fetch_rooms(self, key: tuple) -> List[Room]:
+        user_id, limit, offset = key
+        generation = self._generation
         params = {
             "limit": limit,
             "offset": offset,
@@ -124,22 +339,15 @@ class RoomAPI:
         if user_id:
             params["user_id"] = user_id
         
-        response = await self._http.get("/api/rooms", params=params)
+        response = await self._http.get(_ROOMS_PATH, params=params)
         
         if not response.ok:
-            raise Exception(f"Failed to list rooms: {response.data}")
-        
-        rooms = []
-        for room_data in response.data.get("rooms", []):
-            rooms.append(Room(
-                id=room_data.get("id", ""),
-                name=room_data.get("name", ""),
-                owner=room_data.get("owner", ""),
-                members=room_data.get("members", []),
-                created_at=room_data.get("created_at"),
-                metadata=room_data.get("metadata")
-            ))
+            raise HTTPClientError(response.status, response.data, "Failed to list rooms")
         
+        # 响应体已由 HTTPClient 一次性 orjson 解析，这里单遍构造对象
+        rooms = list(map(Room.from_dict, response.data.get("rooms", ())))
+        if not self._lists_stale(generation):
+            self._cache_put(self._list_cache, key, rooms)
         return rooms
     
     async def join_room(self, room_id: str, user_id: str) -> Room:
@@ -154,22 +362,16 @@ class RoomAPI:
             Room 对象
         """
         response = await self._http.post(
-            f"/api/rooms/{room_id}/join",
+            f"{_ROOMS_PATH}/{room_id}/join",
             data={"user_id": user_id}
         )
         
         if not response.ok:
-            raise Exception(f"Failed to join room: {response.data}")
-        
-        room_data = response.data
-        return Room(
-            id=room_data.get("id", ""),
-            name=room_data.get("name", ""),
-            owner=room_data.get("owner", ""),
-            members=room_data.get("members", []),
-            created_at=room_data.get("created_at"),
-            metadata=room_data.get("metadata")
-        )
+            raise HTTPClientError(response.status, response.data, "Failed to join room")
+        
+        self.invalidate_cache(room_id)
+        
+        return Room.from_dict(response.data)
     
     async def leave_room(self, room_id: str, user_id: str) -> bool:
         """
@@ -182,13 +384,15 @@ class RoomAPI:
         Returns:
             是否离开成功
         """
-        response = await self._http.post(
-            f"/api/rooms/{room_id}/leave",
+        response = await self._http.post_status(
+            f"{_ROOMS_PATH}/{room_id}/leave",
             data={"user_id": user_id}
         )
         
         if not response.ok:
-            raise Exception(f"Failed to leave room: {response.data}")
+            raise HTTPClientError(response.status, response.data, "Failed to leave room")
+        
+        self.invalidate_cache(room_id)
         
         return True
     
@@ -204,22 +408,16 @@ class RoomAPI:
             Room 对象
         """
         response = await self._http.post(
-            f"/api/rooms/{room_id}/members",
+            f"{_ROOMS_PATH}/{room_id}/members",
             data={"user_id": user_id}
         )
         
         if not response.ok:
-            raise Exception(f"Failed to add member: {response.data}")
-        
-        room_data = response.data
-        return Room(
-            id=room_data.get("id", ""),
-            name=room_data.get("name", ""),
-            owner=room_data.get("owner", ""),
-            members=room_data.get("members", []),
-            created_at=room_data.get("created_at"),
-            metadata=room_data.get("metadata")
-        )
+            raise HTTPClientError(response.status, response.data, "Failed to add member")
+        
+        self.invalidate_cache(room_id)
+        
+        return Room.from_dict(response.data)
     
     async def remove_member(self, room_id: str, user_id: str) -> bool:
         """
@@ -232,12 +430,14 @@ class RoomAPI:
         Returns:
             是否移除成功
         """
-        response = await self._http.delete(
-            f"/api/rooms/{room_id}/members/{user_id}"
+        response = await self._http.delete_status(
+            f"{_ROOMS_PATH}/{room_id}/members/{user_id}"
         )
         
         if not response.ok:
-            raise Exception(f"Failed to remove member: {response.data}")
+            raise HTTPClientError(response.status, response.data, "Failed to remove member")
+        
+        self.invalidate_cache(room_id)
         
         return True
     
@@ -266,20 +466,14 @@ class RoomAPI:
         if metadata:
             data["metadata"] = metadata
         
-        response = await self._http.put(f"/api/rooms/{room_id}", data=data)
+        response = await self._http.put(f"{_ROOMS_PATH}/{room_id}", data=data)
         
         if not response.ok:
-            raise Exception(f"Failed to update room: {response.data}")
-        
-        room_data = response.data
-        return Room(
-            id=room_data.get("id", ""),
-            name=room_data.get("name", ""),
-            owner=room_data.get("owner", ""),
-            members=room_data.get("members", []),
-            created_at=room_data.get("created_at"),
-            metadata=room_data.get("metadata")
-        )
+            raise HTTPClientError(response.status, response.data, "Failed to update room")
+        
+        self.invalidate_cache(room_id)
+        
+        return Room.from_dict(response.data)
     
     async def delete_room(self, room_id: str) -> bool:
         """
@@ -291,9 +485,11 @@ class RoomAPI:
         Returns:
             是否删除成功
         """
-        response = await self._http.delete(f"/api/rooms/{room_id}")
+        response = await self._http.delete_status(f"{_ROOMS_PATH}/{room_id}")
         
         if not response.ok:
-            raise Exception(f"Failed to delete room: {response.data}")
+            raise HTTPClientError(response.status, response.data, "Failed to delete room")
+        
+        self.invalidate_cache(room_id)
         
         return True
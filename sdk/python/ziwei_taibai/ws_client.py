@@ -4,17 +4,22 @@
 """
 
 import asyncio
-import json
+import inspect
 import logging
-from typing import Any, Callable, Dict, Optional
-from dataclasses import dataclass
+import random
+from typing import Any, Callable, Dict, Optional, Union
+from dataclasses import dataclass, field
 from enum import Enum
 
 import aiohttp
+import orjson
 
 
 logger = logging.getLogger(__name__)
 
+# 心跳帧只有时间戳会变，其余部分预先编码
+_HEARTBEAT_PREFIX = b'{"type":"heartbeat","timestamp":'
+
 
 class ConnectionState(Enum):
     """连接状态"""
@@ -24,12 +29,50 @@ class ConnectionState(Enum):
     RECONNECTING = "reconnecting"
 
 
-@dataclass
+@dataclass(slots=True)
 class WSMessage:
     """WebSocket 消息"""
     type: str
     data: Any
-    raw: str
+    # 帧原始内容，保持 aiohttp 交付的对象（文本帧 str / 二进制帧 bytes），不做复制或转码
+    payload: Union[str, bytes, None] = field(default=None, repr=False)
+    
+    @property
+    def raw(self) -> str:
+        """原始帧文本（二进制帧在访问时才解码）"""
+        payload = self.payload
+        if payload is None:
+            return ""
+        if isinstance(payload, bytes):
+            return payload.decode(errors="replace")
+        return payload
+
+
+# JSON 对象/数组的首字符（文本帧为 str，二进制帧为 bytes）
+_JSON_OPENERS = ('{', '[', b'{', b'[')
+# 解析失败日志的采样间隔：每 N 次失败记录一次，避免畸形帧刷屏
+_DECODE_ERROR_LOG_EVERY = 100
+# 以 JSON 开头但解析失败的标记
+_DECODE_FAILED = object()
+
+
+def _decode_payload(raw: Union[str, bytes]) -> Any:
+    """
+    解析帧内容：首字符不像 JSON 时直接返回原文，避免异常回退的开销；
+    看起来像 JSON 却解析失败时返回 _DECODE_FAILED
+    """
+    head = raw[:1]
+    if head not in _JSON_OPENERS and not (head.isspace() and raw.lstrip()[:1] in _JSON_OPENERS):
+        return raw
+    # orjson 同时接受 str 与 bytes，二进制帧无需先解码
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return _DECODE_FAILED
+
+
+def _noop_dispatch(msg: WSMessage):
+    pass
 
 
 class WSClient:
@@ -42,7 +85,8 @@ class WSClient:
         reconnect_delay: float = 1.0,
         max_reconnect_delay: float = 60.0,
         reconnect_attempts: int = 0,  # 0 = 无限重连
-        headers: Optional[Dict[str, str]] = None
+        headers: Optional[Dict[str, str]] = None,
+        session: Optional[aiohttp.ClientSession] = None
     ):
         """
         初始化 WebSocket 客户端
@@ -54,27 +98,38 @@ class WSClient:
             max_reconnect_delay: 最大重连延迟（秒）
             reconnect_attempts: 最大重连次数（0 = 无限）
             headers: 连接 headers
+            session: 复用的 aiohttp 会话（可选，由调用方负责关闭；未传入时客户端
+                懒创建自己的会话，在各次重连间复用，并在 close() 时关闭）
         """
         self.url = url
         self.heartbeat_interval = heartbeat_interval
         self.reconnect_delay = reconnect_delay
         self.max_reconnect_delay = max_reconnect_delay
         self.reconnect_attempts = reconnect_attempts
+        # 第 n 次重连的退避上限（指数增长，封顶 max_reconnect_delay）
+        self._reconnect_delays = tuple(
+            min(reconnect_delay * (1 << i), max_reconnect_delay) for i in range(32)
+        )
         self.headers = headers or {}
         
         self._state = ConnectionState.DISCONNECTED
         self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
-        self._session: Optional[aiohttp.ClientSession] = None
-        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        self._heartbeat_handle: Optional[asyncio.TimerHandle] = None
+        self._heartbeat_send: Optional[asyncio.Task] = None
         self._receive_task: Optional[asyncio.Task] = None
         self._reconnect_count = 0
+        self._decode_errors = 0
         self._running = False
         
-        # 消息回调
-        self._message_callbacks: list[Callable[[WSMessage], Any]] = []
-        self._connect_callbacks: list[Callable[[], Any]] = []
-        self._disconnect_callbacks: list[Callable[[], Any]] = []
-        self._error_callbacks: list[Callable[[Exception], Any]] = []
+        # 消息回调（注册时整体替换的 tuple，遍历期间注册也不会影响当前遍历）
+        self._message_callbacks: tuple[Callable[[WSMessage], Any], ...] = ()
+        self._connect_callbacks: tuple[Callable[[], Any], ...] = ()
+        self._disconnect_callbacks: tuple[Callable[[], Any], ...] = ()
+        self._error_callbacks: tuple[Callable[[Exception], Any], ...] = ()
+        self._dispatch_message: Callable[[WSMessage], None] = _noop_dispatch
+        self._callback_tasks: set[asyncio.Task] = set()
     
     @property
     def state(self) -> ConnectionState:
@@ -87,20 +142,61 @@ class WSClient:
         return self._state == ConnectionState.CONNECTED
     
     def on_message(self, callback: Callable[[WSMessage], Any]):
-        """注册消息回调"""
-        self._message_callbacks.append(callback)
+        """注册消息回调（可以是普通函数或 async 函数）"""
+        self._message_callbacks += (callback,)
+        self._dispatch_message = self._make_dispatcher()
+    
+    def _make_dispatcher(self) -> Callable[[WSMessage], None]:
+        """按当前回调列表生成分发函数；同步/异步回调在此一次性区分"""
+        sync_callbacks = tuple(
+            cb for cb in self._message_callbacks if not inspect.iscoroutinefunction(cb)
+        )
+        async_callbacks = tuple(
+            cb for cb in self._message_callbacks if inspect.iscoroutinefunction(cb)
+        )
+        
+        if len(sync_callbacks) == 1 and not async_callbacks:
+            callback = sync_callbacks[0]
+            
+            def dispatch_one(msg: WSMessage):
+                try:
+                    callback(msg)
+                except Exception as e:
+                    logger.error(f"Message callback error: {e}")
+            
+            return dispatch_one
+        
+        tasks = self._callback_tasks
+        
+        def on_task_done(task: asyncio.Task):
+            tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Message callback error: {task.exception()}")
+        
+        def dispatch(msg: WSMessage):
+            for callback in sync_callbacks:
+                try:
+                    callback(msg)
+                except Exception as e:
+                    logger.error(f"Message callback error: {e}")
+            for callback in async_callbacks:
+                task = asyncio.create_task(callback(msg))
+                tasks.add(task)
+                task.add_done_callback(on_task_done)
+        
+        return dispatch
     
     def on_connect(self, callback: Callable[[], Any]):
         """注册连接回调"""
-        self._connect_callbacks.append(callback)
+        self._connect_callbacks += (callback,)
     
     def on_disconnect(self, callback: Callable[[], Any]):
         """注册断开连接回调"""
-        self._disconnect_callbacks.append(callback)
+        self._disconnect_callbacks += (callback,)
     
     def on_error(self, callback: Callable[[Exception], Any]):
         """注册错误回调"""
-        self._error_callbacks.append(callback)
+        self._error_callbacks += (callback,)
     
     async def connect(self):
         """建立 WebSocket 连接"""
@@ -111,19 +207,26 @@ class WSClient:
         self._state = ConnectionState.CONNECTING
         
         try:
-            self._session = aiohttp.ClientSession()
+            # 重连时复用同一会话，保留连接池与 DNS 缓存
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=75)
+                )
+                self._owns_session = True
+            # heartbeat：由 aiohttp 发送协议层 PING 并在 PONG 超时时断开
             self._ws = await self._session.ws_connect(
                 self.url,
                 headers=self.headers,
-                autoclose=False
+                autoclose=False,
+                heartbeat=self.heartbeat_interval
             )
             self._state = ConnectionState.CONNECTED
             self._reconnect_count = 0
             
             logger.info(f"WebSocket connected to {self.url}")
             
-            # 启动心跳和接收任务
-            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+            # 启动应用层心跳定时器和接收任务
+            self._schedule_heartbeat()
             self._receive_task = asyncio.create_task(self._receive_loop())
             
             # 触发连接回调
@@ -145,24 +248,20 @@ class WSClient:
             try:
                 msg = await self._ws.receive()
                 
-                if msg.type == aiohttp.WSMsgType.TEXT:
-                    try:
-                        data = json.loads(msg.data)
-                    except json.JSONDecodeError:
+                if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    data = _decode_payload(msg.data)
+                    if data is _DECODE_FAILED:
                         data = msg.data
+                        self._on_decode_error(data)
                     
                     ws_msg = WSMessage(
-                        type='text',
+                        type='text' if msg.type == aiohttp.WSMsgType.TEXT else 'binary',
                         data=data,
-                        raw=msg.data
+                        payload=msg.data
                     )
                     
                     # 触发消息回调
-                    for callback in self._message_callbacks:
-                        try:
-                            callback(ws_msg)
-                        except Exception as e:
-                            logger.error(f"Message callback error: {e}")
+                    self._dispatch_message(ws_msg)
                             
                 elif msg.type == aiohttp.WSMsgType.ERROR:
                     logger.error(f"WebSocket error: {msg.data}")
@@ -184,24 +283,37 @@ class WSClient:
         
         await self._handle_disconnect()
     
-    async def _heartbeat_loop(self):
-        """心跳循环"""
-        while self._running and self._ws:
-            try:
-                await asyncio.sleep(self.heartbeat_interval)
-                
-                if self._ws and not self._ws.closed:
-                    await self._ws.send_str(json.dumps({
-                        'type': 'heartbeat',
-                        'timestamp': asyncio.get_event_loop().time()
-                    }))
-                    logger.debug("Heartbeat sent")
-                    
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Heartbeat error: {e}")
-                break
+    def _schedule_heartbeat(self):
+        """安排下一次应用层心跳（定时器回调，不常驻任务）"""
+        if self._heartbeat_handle:
+            self._heartbeat_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self._heartbeat_handle = loop.call_later(self.heartbeat_interval, self._send_heartbeat, loop)
+    
+    def _send_heartbeat(self, loop: asyncio.AbstractEventLoop):
+        """发送应用层心跳帧并安排下一次"""
+        self._heartbeat_handle = None
+        ws = self._ws
+        if not self._running or ws is None or ws.closed:
+            return
+        frame = _HEARTBEAT_PREFIX + repr(loop.time()).encode() + b'}'
+        self._heartbeat_send = loop.create_task(ws.send_frame(frame, aiohttp.WSMsgType.TEXT))
+        self._heartbeat_send.add_done_callback(self._on_heartbeat_sent)
+        self._schedule_heartbeat()
+    
+    def _on_heartbeat_sent(self, task: asyncio.Task):
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error(f"Heartbeat error: {task.exception()}")
+        else:
+            logger.debug("Heartbeat sent")
+    
+    def _on_decode_error(self, raw: Union[str, bytes]):
+        """记录 JSON 解析失败（按 _DECODE_ERROR_LOG_EVERY 采样）"""
+        self._decode_errors += 1
+        if self._decode_errors % _DECODE_ERROR_LOG_EVERY == 1 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Malformed JSON frame ({self._decode_errors} so far): {raw[:64]!r}")
     
     async def send(self, data: Dict[str, Any]):
         """
@@ -210,18 +322,40 @@ class WSClient:
         Args:
             data: 要发送的数据（会自动序列化为 JSON）
         """
-        if not self._ws or self._ws.closed:
+        # orjson 输出即 UTF-8 bytes，直接作为文本帧发送，省去 str 往返编码
+        await self.send_prepared(orjson.dumps(data))
+        logger.debug("Sent: %s", data)
+    
+    async def send_prepared(self, payload: bytes):
+        """
+        发送已序列化的 JSON 消息
+        
+        广播场景下调用方只需 orjson.dumps 一次，再对每个连接调用本方法，
+        避免逐连接重复序列化。
+        
+        Args:
+            payload: UTF-8 编码的 JSON 字节串（以文本帧发送）
+        """
+        ws = self._ws
+        if ws is None:
             raise ConnectionError("WebSocket is not connected")
         
-        await self._ws.send_str(json.dumps(data))
-        logger.debug(f"Sent: {data}")
+        # 不预先轮询 closed：连接已断时发送本身会抛出 ClientConnectionError
+        try:
+            await ws.send_frame(payload, aiohttp.WSMsgType.TEXT)
+        except aiohttp.ClientConnectionError as e:
+            raise ConnectionError("WebSocket is not connected") from e
     
     async def send_text(self, text: str):
         """发送文本消息"""
-        if not self._ws or self._ws.closed:
+        ws = self._ws
+        if ws is None:
             raise ConnectionError("WebSocket is not connected")
         
-        await self._ws.send_str(text)
+        try:
+            await ws.send_str(text)
+        except aiohttp.ClientConnectionError as e:
+            raise ConnectionError("WebSocket is not connected") from e
     
     async def close(self, code: int = 1000, reason: str = ""):
         """
@@ -233,13 +367,10 @@ class WSClient:
         """
         self._running = False
         
-        # 取消任务
-        if self._heartbeat_task:
-            self._heartbeat_task.cancel()
-            try:
-                await self._heartbeat_task
-            except asyncio.CancelledError:
-                pass
+        # 取消心跳定时器和任务
+        if self._heartbeat_handle:
+            self._heartbeat_handle.cancel()
+            self._heartbeat_handle = None
         
         if self._receive_task:
             self._receive_task.cancel()
@@ -252,8 +383,10 @@ class WSClient:
         if self._ws and not self._ws.closed:
             await self._ws.close(code=code, message=reason.encode())
         
-        if self._session:
+        # 只关闭自己创建的会话，外部传入的会话由调用方管理
+        if self._owns_session and self._session is not None:
             await self._session.close()
+            self._session = None
         
         self._state = ConnectionState.DISCONNECTED
         logger.info("WebSocket closed")
@@ -287,12 +420,11 @@ class WSClient:
         self._state = ConnectionState.RECONNECTING
         self._reconnect_count += 1
         
-        delay = min(
-            self.reconnect_delay * (2 ** (self._reconnect_count - 1)),
-            self.max_reconnect_delay
-        )
+        # Full jitter：在 [0, 上限] 内随机，避免大量客户端同时重连
+        ceiling = self._reconnect_delays[min(self._reconnect_count, 32) - 1]
+        delay = random.uniform(0, ceiling)
         
-        logger.info(f"Reconnecting in {delay}s (attempt {self._reconnect_count})")
+        logger.info(f"Reconnecting in {delay:.2f}s (attempt {self._reconnect_count})")
         
         await asyncio.sleep(delay)
         